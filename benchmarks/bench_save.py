@@ -0,0 +1,87 @@
+"""Measure save throughput and latency of storage backends
+
+Usage: python -m benchmarks.bench_save [--tasks N] [--saves N] [--no-fsync] [--indent N]
+
+Prints one json object per storage with file size, saves per second and
+p50 / p99 / max latency of a single save in milliseconds.
+"""
+from argparse import ArgumentParser
+from json import dumps
+from statistics import quantiles
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from os.path import getsize, join
+
+from src.storage import JournalStore, JsonStore, dump_tasks, write_atomic
+from src.task import Task
+
+
+def make_tasks(count: int) -> dict[int, Task]:
+    return {id: Task(id, f"title {id}", f"description of task {id}", f"category{id % 10}",
+                     f"2024-{id % 12 + 1:02d}-{id % 28 + 1:02d}", ("low", "medium", "high")[id % 3])
+            for id in range(1, count + 1)}
+
+
+def summary(name: str, latencies: list[float], size: int) -> dict:
+    percentiles = quantiles(latencies, n=100, method="inclusive")
+    return {"storage": name, "saves": len(latencies), "bytes": size,
+            "saves_per_second": round(len(latencies) / sum(latencies), 1),
+            "p50_ms": round(percentiles[49] * 1000, 3), "p99_ms": round(percentiles[98] * 1000, 3),
+            "max_ms": round(max(latencies) * 1000, 3)}
+
+
+def bench_json(directory: str, tasks: dict[int, Task], saves: int, fsync: bool, indent: int | None) -> dict:
+    path = join(directory, "tasks.json")
+    store = JsonStore(path, fsync=fsync)
+    latencies = list()
+
+    for _ in range(saves):
+        start = perf_counter()
+        # Indent is written the same way as old non-atomic save for comparison
+        if indent is None:
+            store.save(tasks, len(tasks), [])
+        else:
+            write_atomic(path, dump_tasks(tasks, len(tasks), indent=indent), fsync)
+        latencies.append(perf_counter() - start)
+
+    return summary("json" if indent is None else f"json indent={indent}", latencies, getsize(path))
+
+
+def bench_journal(directory: str, tasks: dict[int, Task], saves: int, fsync: bool) -> dict:
+    path = join(directory, "journal.json")
+    store = JournalStore(path, fsync=fsync)
+    store.compact(tasks, len(tasks))
+    latencies = list()
+
+    # Every save appends one change, compaction happens every compact_threshold saves
+    for number in range(saves):
+        record = {"op": "status", "id": number % len(tasks) + 1, "status": "Done"}
+        start = perf_counter()
+        store.save(tasks, len(tasks), [record])
+        latencies.append(perf_counter() - start)
+
+    return summary("journal", latencies, getsize(path) + getsize(store.journal_path))
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--saves", type=int, default=50)
+    parser.add_argument("--no-fsync", action="store_true")
+    parser.add_argument("--indent", type=int, default=4, help="indent of compared pretty printed save")
+    arguments = parser.parse_args()
+
+    tasks = make_tasks(arguments.tasks)
+    fsync = not arguments.no_fsync
+
+    with TemporaryDirectory() as directory:
+        results = [bench_json(directory, tasks, arguments.saves, fsync, None),
+                   bench_json(directory, tasks, arguments.saves, fsync, arguments.indent),
+                   bench_journal(directory, tasks, arguments.saves, fsync)]
+
+    for result in results:
+        print(dumps({"tasks": arguments.tasks, "fsync": fsync, **result}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Load test of HTTP/JSON server
+
+Usage: python -m benchmarks.load_test [--url http://127.0.0.1:8080] [--clients N] [--requests N] [--pipeline N]
+
+Without --url a server with temporary save file is started in this process.
+Every client keeps one connection open and sends --pipeline requests at
+once before reading responses. Requests are adds and finds in turn. Prints
+json with requests per second and p50 / p99 / max latency in milliseconds.
+"""
+from argparse import ArgumentParser
+from json import dumps
+from os.path import join
+from statistics import quantiles
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+from urllib.parse import urlsplit
+import socket
+
+from src.server import TaskServer
+from src.task_manager import TaskManager
+
+
+def make_request(number: int) -> bytes:
+    if number % 2:
+        return b"GET /tasks?category=load1&priority=high&match=all HTTP/1.1\r\nHost: localhost\r\n\r\n"
+
+    body = dumps({"title": f"load {number}", "description": "load test", "category": f"load{number % 3}",
+                  "deadline": "2024-12-31", "priority": "high"}).encode()
+    return (b"POST /tasks HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+
+
+def read_response(file) -> int:
+    """Read one response from connection, return its status"""
+
+    status = int(file.readline().split()[1])
+    length = 0
+
+    while (line := file.readline()) not in (b"\r\n", b""):
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+
+    file.read(length)
+    return status
+
+
+def client(address: tuple[str, int], requests: int, pipeline: int, latencies: list[float], errors: list[int]) -> None:
+    with socket.create_connection(address) as connection:
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        file = connection.makefile("rb")
+
+        for start in range(0, requests, pipeline):
+            count = min(pipeline, requests - start)
+            sent = perf_counter()
+            connection.sendall(b"".join(make_request(start + number) for number in range(count)))
+
+            # Latency of pipelined request lasts until its own response
+            for _ in range(count):
+                if read_response(file) >= 400:
+                    errors.append(1)
+                latencies.append(perf_counter() - sent)
+
+
+def run(address: tuple[str, int], clients: int, requests: int, pipeline: int) -> dict:
+    latencies, errors = list(), list()
+    threads = [Thread(target=client, args=(address, requests, pipeline, latencies, errors)) for _ in range(clients)]
+
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    percentiles = quantiles(latencies, n=100, method="inclusive")
+    return {"clients": clients, "requests": len(latencies), "pipeline": pipeline, "errors": len(errors),
+            "requests_per_second": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentiles[49] * 1000, 3), "p99_ms": round(percentiles[98] * 1000, 3),
+            "max_ms": round(max(latencies) * 1000, 3)}
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="running server, started here if omitted")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="requests per client")
+    parser.add_argument("--pipeline", type=int, default=1, help="requests sent at once by client")
+    arguments = parser.parse_args()
+
+    if arguments.url:
+        url = urlsplit(arguments.url)
+        result = run((url.hostname, url.port or 80), arguments.clients, arguments.requests, arguments.pipeline)
+    else:
+        with TemporaryDirectory() as directory:
+            server = TaskServer(("127.0.0.1", 0), TaskManager(join(directory, "tasks.json")))
+            Thread(target=server.serve_forever, daemon=True).start()
+
+            result = run(server.server_address, arguments.clients, arguments.requests, arguments.pipeline)
+
+            server.shutdown()
+            server.server_close()
+
+    print(dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from argparse import ArgumentParser
 from configparser import ConfigParser
 
 # My modules
@@ -6,29 +7,73 @@ from src.cli import CLI
 from src.prettifier import pf
 
 
-def load_config() -> str:
+def load_config() -> dict:
     """Load config from config.ini and return it's values
 
     Returns:
-        str: save file path
+        dict: TaskManager arguments
     """
 
     config = ConfigParser()
     config.read("config.ini")
-    save_file_path = config.get('PROD', 'SAVE_FILE_PATH')
 
-    return save_file_path
+    task_manager_config = {
+        "save_file_path": config.get('PROD', 'SAVE_FILE_PATH'),
+        "storage": config.get('PROD', 'STORAGE', fallback="json"),
+        "flush_policy": config.get('PROD', 'FLUSH_POLICY', fallback="immediate"),
+        "flush_every": config.getint('PROD', 'FLUSH_EVERY', fallback=100),
+        "flush_interval": config.getfloat('PROD', 'FLUSH_INTERVAL', fallback=5.0),
+    }
+
+    # Database is filled from save file on first start
+    if task_manager_config["storage"] == "sqlite":
+        task_manager_config["database"] = config.get('PROD', 'SQLITE_FILE_PATH', fallback=None)
+
+    # File stores are replaced atomically and may keep previous versions
+    else:
+        task_manager_config["fsync"] = config.getboolean('PROD', 'FSYNC', fallback=True)
+        task_manager_config["backups"] = config.getint('PROD', 'BACKUPS', fallback=0)
+
+    return task_manager_config
+
+
+def parse_arguments():
+    """Parse command line arguments, interactive mode is used without command
+
+    Returns:
+        Namespace: command and its options
+    """
+
+    parser = ArgumentParser(description="Task manager")
+    commands = parser.add_subparsers(dest="command")
+
+    serve = commands.add_parser("serve", help="serve tasks over HTTP/JSON on localhost")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: %(default)s)")
+    serve.add_argument("--port", type=int, default=8080, help="port to listen on (default: %(default)s)")
+
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
+    arguments = parse_arguments()
+
     # Load config from config.ini
-    save_file_path = load_config()
+    config = load_config()
+
+    # Create task manager
+    task_manager = TaskManager(**config)
+
+    # Share one in-memory store between HTTP clients
+    if arguments.command == "serve":
+        from src.server import serve
+
+        print(f"Serving tasks on http://{arguments.host}:{arguments.port}")
+        serve(task_manager, arguments.host, arguments.port)
 
-    # Create task manager and cli objects
-    task_manager = TaskManager(save_file_path)
-    cli = CLI(task_manager)
+    else:
+        cli = CLI(task_manager)
 
-    # Show banner, commands and start handling user input
-    pf.show_banner()
-    cli.show_commands()
-    cli.command_handler()
+        # Show banner, commands and start handling user input
+        pf.show_banner()
+        cli.show_commands()
+        cli.command_handler()
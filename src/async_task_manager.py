@@ -0,0 +1,196 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import partial
+
+from src.task import Task
+from src.task_manager import TaskManager
+from src.query import Predicate
+
+
+class AsyncTaskManager:
+    """TaskManager for asyncio programs, storage I/O does not block event loop
+
+    All operations run one by one in a single worker thread, so the wrapped
+    TaskManager is never used from two threads at once. Changes are kept in
+    memory and saved by group commit: every change waits for one flush that
+    runs after it, and changes made by concurrent clients meanwhile are saved
+    by the same flush. So a finished change is saved as with the "immediate"
+    flush policy, but many clients cost one write instead of one write each.
+    """
+
+    def __init__(self, save_file_path: str, storage: str = "json", **options) -> None:
+        """Create wrapped TaskManager and its worker thread
+
+        Args:
+            save_file_path (str): path to save file
+            storage (str, optional): storage backend name, see storage.STORAGES. Defaults to "json".
+            **options: TaskManager arguments except flush policy
+        """
+
+        self.task_manager = TaskManager(save_file_path, storage, flush_policy="exit", **options)
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-manager")
+
+        # Flush which is scheduled but not started yet, joined by every change
+        self.__pending_flush: asyncio.Future | None = None
+
+    async def __run(self, method, *args, **kwargs):
+        """Call TaskManager method in worker thread
+
+        Args:
+            method (Callable): bound TaskManager method
+            *args: method arguments
+            **kwargs: method keyword arguments
+
+        Returns:
+            method result
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, partial(method, *args, **kwargs))
+
+    async def __change(self, method, *args, **kwargs):
+        """Call changing TaskManager method and wait until the change is saved
+
+        Args:
+            method (Callable): bound TaskManager method
+            *args: method arguments
+            **kwargs: method keyword arguments
+
+        Returns:
+            method result
+        """
+
+        result = await self.__run(method, *args, **kwargs)
+
+        # Flush which has not started yet will save this change as well
+        if self.__pending_flush is None:
+            self.__pending_flush = asyncio.ensure_future(self.__group_flush())
+
+        # Cancelled caller must not cancel flush of other clients
+        await asyncio.shield(self.__pending_flush)
+
+        return result
+
+    async def __group_flush(self) -> None:
+        """Save all changes made before flush started"""
+
+        # Changes made from now on need next flush
+        self.__pending_flush = None
+        await self.__run(self.task_manager.flush)
+
+    async def add(self, title: str, description: str, category: str, deadline: str, priority: str) -> Task | str:
+        """Create new Task and save it, see TaskManager.add"""
+
+        return await self.__change(self.task_manager.add, title, description, category, deadline, priority)
+
+    async def remove(self, id: int = None, category: str = None) -> list[Task] | str:
+        """Remove one task by id OR all tasks with specific category, see TaskManager.remove"""
+
+        return await self.__change(self.task_manager.remove, id, category)
+
+    async def change(self, id: int, title: str = None, description: str = None, category: str = None,
+                     deadline: str = None, priority: str = None) -> Task | str:
+        """Change task by id with new data, see TaskManager.change"""
+
+        return await self.__change(self.task_manager.change, id, title, description, category, deadline, priority)
+
+    async def status(self, id: int) -> Task | str:
+        """Switch status for task with specific id, see TaskManager.status"""
+
+        return await self.__change(self.task_manager.status, id)
+
+    async def add_many(self, items: Iterable[tuple | dict]) -> list[Task | str]:
+        """Create many tasks, see TaskManager.add_many"""
+
+        return await self.__change(self.task_manager.add_many, list(items))
+
+    async def remove_many(self, ids: Iterable[int]) -> list[Task | str]:
+        """Remove many tasks by id, see TaskManager.remove_many"""
+
+        return await self.__change(self.task_manager.remove_many, list(ids))
+
+    async def change_many(self, changes: Iterable[dict]) -> list[Task | str]:
+        """Change many tasks, see TaskManager.change_many"""
+
+        return await self.__change(self.task_manager.change_many, list(changes))
+
+    async def set_status_many(self, ids: Iterable[int], status: str = None) -> list[Task | str]:
+        """Set status for many tasks, see TaskManager.set_status_many"""
+
+        return await self.__change(self.task_manager.set_status_many, list(ids), status)
+
+    async def find(self, id: int = None, title: str = None, category: str = None, priority: str = None,
+                   status: str = None, match: str = "any") -> list[Task] | str:
+        """Find tasks by filters, see TaskManager.find"""
+
+        return await self.__run(self.task_manager.find, id, title, category, priority, status, match=match)
+
+    async def query(self, where: Predicate = None, sort_by: str | Iterable[str] = "id", reverse: bool = False,
+                    limit: int = None) -> list[Task]:
+        """Filter, sort and cut tasks, see TaskManager.query"""
+
+        return await self.__run(self.task_manager.query, where, sort_by, reverse, limit)
+
+    async def search(self, text: str, limit: int = 10) -> list[Task]:
+        """Search words in title and description, see TaskManager.search"""
+
+        return await self.__run(self.task_manager.search, text, limit)
+
+    async def due(self, before: str | date = None, after: str | date = None) -> list[Task]:
+        """Get tasks with deadline in date range, see TaskManager.due"""
+
+        return await self.__run(self.task_manager.due, before, after)
+
+    async def overdue(self, today: str | date = None) -> list[Task]:
+        """Get not done tasks with passed deadline, see TaskManager.overdue"""
+
+        return await self.__run(self.task_manager.overdue, today)
+
+    async def show(self) -> list[Task] | str:
+        """Get Task objects list, see TaskManager.show"""
+
+        return await self.__run(self.task_manager.show)
+
+    async def export(self, path: str, indent: int = 4) -> int:
+        """Write all tasks to readable json file, see TaskManager.export"""
+
+        return await self.__run(self.task_manager.export, path, indent)
+
+    async def iter_tasks(self, page_size: int = 100) -> AsyncIterator[Task]:
+        """Iterate over tasks in id order, reading them page by page in worker thread
+
+        Pages are taken by id cursor, so tasks changed between pages are not
+        skipped or repeated.
+
+        Args:
+            page_size (int, optional): tasks read at once. Defaults to 100.
+
+        Yields:
+            AsyncIterator[Task]: Task objects
+        """
+
+        after_id = None
+
+        while True:
+            page = await self.__run(lambda: list(self.task_manager.iter_tasks(limit=page_size, after_id=after_id)))
+
+            for task in page:
+                yield task
+
+            if len(page) < page_size:
+                return
+
+            after_id = page[-1].id
+
+    async def flush(self) -> None:
+        """Write unsaved changes to save file"""
+
+        await self.__run(self.task_manager.flush)
+
+    async def close(self) -> None:
+        """Write unsaved changes and stop worker thread"""
+
+        await self.__run(self.task_manager.close)
+        self.__executor.shutdown()
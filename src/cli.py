@@ -1,10 +1,34 @@
 import re
+import csv
+from collections.abc import Iterable
 from dataclasses import asdict
+from datetime import date, timedelta
+from itertools import islice
+from json import loads
+from os.path import exists
 
+from src.task import validate_task_data
 from src.task_manager import TaskManager, Task
 from src.prettifier import pf
 
 
+def read_tasks_file(path: str) -> list[dict]:
+    """Read tasks data from CSV file with header OR JSON lines file
+
+    Args:
+        path (str): path to .csv file OR file with one json object per line
+
+    Returns:
+        list[dict]: task data with title, description, category, deadline and priority keys
+    """
+
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if path.lower().endswith(".csv"):
+            return list(csv.DictReader(file))
+
+        return [loads(line) for line in file if line.strip()]
+
+
 class CLI:
     def __init__(self, task_manager: TaskManager) -> None:
         self.commands = {
@@ -14,11 +38,70 @@ class CLI:
             "change": "change existing task",
             "status": "switch status for existing task",
             "find": "filter tasks by id, title, category, priority or status",
-            "show": "show all tasks"
+            "show": "show all tasks",
+            "import": "add tasks from CSV or JSON lines file",
+            "due": "show tasks with deadline in date range",
+            "overdue": "show not done tasks with passed deadline",
+            "export": "write all tasks to readable json file"
         }
 
         self.task_manager = task_manager
         self.deadline_pattern = '\d{4}-\d{2}-\d{2}'
+        self.page_size = 20
+
+    def validate_task_data(self, data: dict) -> str | None:
+        """Check task data read from file the same way as entered one
+
+        Args:
+            data (dict): task data
+
+        Returns:
+            str | None: failure description OR None if data is valid
+        """
+
+        return validate_task_data(data)
+
+    def show_pages(self, tasks: Iterable[Task], empty_message: str, ordinals: bool = True) -> None:
+        """Print tasks page by page, taking next page from tasks only when it is asked
+
+        Args:
+            tasks (Iterable[Task]): Task objects, may be lazy iterator
+            empty_message (str): text printed if there are no tasks
+            ordinals (bool, optional): print position of task in list. Defaults to True.
+        """
+
+        tasks = iter(tasks)
+        ordinal = 0
+
+        while True:
+            page = list(islice(tasks, self.page_size))
+
+            if not page:
+                if ordinal == 0:
+                    pf.print("\t\t" + empty_message)
+                    print("\n")
+                break
+
+            for task in page:
+                ordinal += 1
+
+                # Position in list, ids keep gaps after removal
+                if ordinals:
+                    pf.print(f"\t#{ordinal}", style="info")
+
+                for name, value in asdict(task).items():
+                    pf.print(f"\t\t{name}: ", style="command", end="")
+                    pf.print(value)
+
+                print("\n")
+
+            # Last page is not full
+            if len(page) < self.page_size:
+                break
+
+            if pf.ask("More", description="(Enter - next page, q - stop)") == "q":
+                print("\n")
+                break
 
     def show_commands(self) -> None:
         """Print all available commands"""
@@ -176,47 +259,84 @@ class CLI:
                                 while (not id) or (not id.isdigit()):
                                     id = pf.ask("Task ID", description="(task id must be digit)", style="error")
 
-                                result = self.task_manager.find(id=int(id))
+                                filters = {"id": int(id)}
 
                             case "title":
-                                title = pf.ask("Title")
-                                result = self.task_manager.find(title=title)
+                                filters = {"title": pf.ask("Title")}
                             case "category":
-                                category = pf.ask("Category")
-                                result = self.task_manager.find(category=category)
+                                filters = {"category": pf.ask("Category")}
                             case "priority":
-                                priority = pf.ask("Priority")
-                                result = self.task_manager.find(priority=priority)
+                                filters = {"priority": pf.ask("Priority")}
                             case "status":
-                                status = pf.ask("Status")
-                                result = self.task_manager.find(status=status)
+                                filters = {"status": pf.ask("Status")}
+
+                        # Show found tasks page by page
+                        print("\n")
+                        self.show_pages(self.task_manager.iter_find(**filters), "no task found", ordinals=False)
+
+                    case "import":
+                        print("\n")
+                        path = pf.ask("File path", description="(.csv or .jsonl)")
+                        while not exists(path):
+                            path = pf.ask("File path", description="(file does not exist)", style="error")
+
+                        # Skip rows which would not pass interactive checks
+                        rows = read_tasks_file(path)
+                        errors = {number: self.validate_task_data(row) for number, row in enumerate(rows, start=1)}
+                        valid_rows = [row for number, row in enumerate(rows, start=1) if errors[number] is None]
+
+                        # Add all tasks with one save
+                        results = self.task_manager.add_many(valid_rows)
+                        added = [task for task in results if not isinstance(task, str)]
+                        pf.print(f"\tImported {len(added)} of {len(rows)} tasks", style="info")
 
                         # Check result
-                        if isinstance(result, str):
-                            pf.print("\t" + result, style="error")
-                            print("\n")
-                        else:
-                            print("\n")
-                            for task in result:
-                                for name, value in asdict(task).items():
-                                    pf.print(f"\t\t{name}: ", style="command", end="")
-                                    pf.print(value)
+                        for number, error in errors.items():
+                            if error is not None:
+                                pf.print(f"\tRow {number}: {error}", style="error")
+                        for result in results:
+                            if isinstance(result, str):
+                                pf.print("\t" + result, style="error")
 
-                                print("\n")
+                        print('\n')
 
                     case "show":
-                        task_list: list[Task] = self.task_manager.show()
-                        if isinstance(task_list, str):
-                            pf.print("\n\t\t" + task_list)
-                            print("\n")
-                        else:
-                            print("\n")
-                            for task in task_list:
-                                for name, value in asdict(task).items():
-                                    pf.print(f"\t\t{name}: ", style="command", end="")
-                                    pf.print(value)
+                        print("\n")
+                        self.show_pages(self.task_manager.iter_tasks(),
+                                        "You have no task at the moment - create one! (add)")
 
-                                print("\n")
+                    case "due":
+                        print("\n")
+                        after = pf.ask("From", description="(like 2024-12-31, omit to start from today)")
+                        while after and not re.fullmatch(self.deadline_pattern, after):
+                            after = pf.ask("From", description="(like 2024-12-31)", style="error")
+
+                        before = pf.ask("To", description="(like 2024-12-31, omit for next 7 days)")
+                        while before and not re.fullmatch(self.deadline_pattern, before):
+                            before = pf.ask("To", description="(like 2024-12-31)", style="error")
+
+                        # Next week by default
+                        after = date.fromisoformat(after) if after else date.today()
+                        before = date.fromisoformat(before) if before else after + timedelta(days=7)
+
+                        print("\n")
+                        self.show_pages(self.task_manager.due(before=before, after=after), "no task found", ordinals=False)
+
+                    case "overdue":
+                        print("\n")
+                        self.show_pages(self.task_manager.overdue(), "no overdue task", ordinals=False)
+
+                    case "export":
+                        print("\n")
+                        path = pf.ask("File path", description="(like tasks_export.json)")
+                        while not path:
+                            path = pf.ask("File path", description="(field cannot be empty)", style="error")
+
+                        # Export task
+                        count = self.task_manager.export(path)
+                        pf.print(f"\tExported {count} tasks to {path}", style="info")
+
+                        print('\n')
 
         except KeyboardInterrupt:
             print('\n')
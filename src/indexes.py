@@ -0,0 +1,260 @@
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from json import dump, dumps, load, loads
+
+from src.task import Task
+
+
+# Task fields answered by exact match lookups
+INDEXED_FIELDS = ("category", "priority", "status")
+
+
+class FieldIndex:
+    """Inverted index of one task field: value -> ids of tasks with this value"""
+
+    def __init__(self, field: str) -> None:
+        """Create empty index
+
+        Args:
+            field (str): indexed task field
+        """
+
+        self.field = field
+        self.ids: dict[str, set[int]] = dict()
+
+    def add(self, task: Task) -> None:
+        """Add task to index
+
+        Args:
+            task (Task): Task object
+        """
+
+        self.ids.setdefault(getattr(task, self.field), set()).add(task.id)
+
+    def discard(self, task: Task) -> None:
+        """Remove task from index if it is there
+
+        Args:
+            task (Task): Task object
+        """
+
+        ids = self.ids.get(getattr(task, self.field))
+        if ids is None:
+            return
+
+        ids.discard(task.id)
+        if not ids:
+            del self.ids[getattr(task, self.field)]
+
+    def lookup(self, value: str) -> set[int]:
+        """Get ids of tasks with value, returned set must not be changed
+
+        Args:
+            value (str): field value
+
+        Returns:
+            set[int]: task ids
+        """
+
+        return self.ids.get(value, set())
+
+    def rebuild(self, task_list: Iterable[Task]) -> None:
+        """Fill index from scratch
+
+        Args:
+            task_list (Iterable[Task]): Task objects
+        """
+
+        self.ids = dict()
+        for task in task_list:
+            self.add(task)
+
+
+class DeadlineIndex:
+    """Sorted index of task deadlines, answers date range queries by bisection
+
+    Tasks with deadline that is not a date are not indexed.
+    """
+
+    field = "deadline"
+
+    def __init__(self) -> None:
+        """Create empty index"""
+
+        self.entries: list[tuple[int, int]] = list()
+
+    def add(self, task: Task) -> None:
+        """Add task to index
+
+        Args:
+            task (Task): Task object
+        """
+
+        if task.deadline_ordinal is not None:
+            insort(self.entries, (task.deadline_ordinal, task.id))
+
+    def discard(self, task: Task) -> None:
+        """Remove task from index if it is there
+
+        Args:
+            task (Task): Task object
+        """
+
+        entry = (task.deadline_ordinal, task.id)
+        if entry[0] is None:
+            return
+
+        position = bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+
+    def range(self, low: int = None, high: int = None) -> list[int]:
+        """Get ids of tasks with deadline between low and high ordinals, both included
+
+        Args:
+            low (int, optional): first date ordinal, not limited if None. Defaults to None.
+            high (int, optional): last date ordinal, not limited if None. Defaults to None.
+
+        Returns:
+            list[int]: task ids ordered by deadline
+        """
+
+        start = 0 if low is None else bisect_left(self.entries, (low,))
+        end = len(self.entries) if high is None else bisect_left(self.entries, (high + 1,))
+
+        return [id for _, id in self.entries[start:end]]
+
+    def rebuild(self, task_list: Iterable[Task]) -> None:
+        """Fill index from scratch
+
+        Args:
+            task_list (Iterable[Task]): Task objects
+        """
+
+        self.entries = sorted((task.deadline_ordinal, task.id) for task in task_list
+                              if task.deadline_ordinal is not None)
+
+
+class TextIndex:
+    """Trigram index over title and description for substring search
+
+    Every lowercased three character piece of text points to ids of tasks
+    containing it. Ids of tasks containing text are found by intersecting sets
+    of its trigrams, then each candidate must be checked, because trigrams
+    can appear in other order and case is ignored.
+    """
+
+    fields = ("title", "description")
+
+    def __init__(self) -> None:
+        """Create empty index"""
+
+        self.grams: dict[str, dict[str, set[int]]] = {field: dict() for field in self.fields}
+
+    @staticmethod
+    def trigrams(text: str) -> set[str]:
+        """Split text into lowercased trigrams
+
+        Args:
+            text (str): text to split
+
+        Returns:
+            set[str]: trigrams
+        """
+
+        text = text.lower()
+        return {text[start:start + 3] for start in range(len(text) - 2)}
+
+    def add(self, task: Task) -> None:
+        """Add task to index
+
+        Args:
+            task (Task): Task object
+        """
+
+        for field in self.fields:
+            grams = self.grams[field]
+            for gram in self.trigrams(getattr(task, field)):
+                grams.setdefault(gram, set()).add(task.id)
+
+    def discard(self, task: Task) -> None:
+        """Remove task from index if it is there
+
+        Args:
+            task (Task): Task object
+        """
+
+        for field in self.fields:
+            grams = self.grams[field]
+            for gram in self.trigrams(getattr(task, field)):
+                ids = grams.get(gram)
+                if ids is not None:
+                    ids.discard(task.id)
+                    if not ids:
+                        del grams[gram]
+
+    def candidates(self, field: str, text: str) -> set[int] | None:
+        """Get ids of tasks which may contain text in field
+
+        Args:
+            field (str): title or description
+            text (str): searched text
+
+        Returns:
+            set[int] | None: candidate ids OR None if text is shorter than trigram and all tasks must be checked
+        """
+
+        grams = sorted((self.grams[field].get(gram, set()) for gram in self.trigrams(text)), key=len)
+        if not grams:
+            return None
+
+        return set(grams[0]).intersection(*grams[1:])
+
+    def rebuild(self, task_list: Iterable[Task]) -> None:
+        """Fill index from scratch
+
+        Args:
+            task_list (Iterable[Task]): Task objects
+        """
+
+        self.grams = {field: dict() for field in self.fields}
+        for task in task_list:
+            self.add(task)
+
+    def save(self, path: str, signature) -> None:
+        """Write index to file together with signature of tasks it was built for
+
+        Args:
+            path (str): index file path
+            signature: signature of store files
+        """
+
+        data = {"signature": signature,
+                "grams": {field: {gram: list(ids) for gram, ids in grams.items()} for field, grams in self.grams.items()}}
+
+        with open(path, "w", encoding="utf-8") as file:
+            dump(data, file, ensure_ascii=False, separators=(",", ":"))
+
+    def load(self, path: str, signature) -> bool:
+        """Read index from file if it was built for the same tasks
+
+        Args:
+            path (str): index file path
+            signature: signature of store files
+
+        Returns:
+            bool: True if index was loaded
+        """
+
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = load(file)
+        except (OSError, ValueError):
+            return False
+
+        # Signature is a tuple, it becomes a list in json
+        if data.get("signature") != loads(dumps(signature)):
+            return False
+
+        self.grams = {field: {gram: set(ids) for gram, ids in grams.items()} for field, grams in data["grams"].items()}
+        return True
@@ -0,0 +1,197 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from heapq import nlargest, nsmallest
+
+from src.task import Task, deadline_ordinal
+from src.indexes import DeadlineIndex, FieldIndex, TextIndex
+
+
+# Sort order of priorities, most urgent first
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+
+@dataclass(frozen=True)
+class Eq:
+    """Task field is equal to value"""
+
+    field: str
+    value: str | int
+
+    def matches(self, task: Task) -> bool:
+        return getattr(task, self.field) == self.value
+
+
+@dataclass(frozen=True)
+class Contains:
+    """Task field contains text"""
+
+    field: str
+    text: str
+
+    def matches(self, task: Task) -> bool:
+        return self.text in getattr(task, self.field)
+
+
+@dataclass(frozen=True)
+class Between:
+    """Task field is between low and high, both included, omitted bound is not checked
+
+    Deadline is compared as date, tasks with deadline that is not a date never match.
+    """
+
+    field: str
+    low: str | int = None
+    high: str | int = None
+
+    def matches(self, task: Task) -> bool:
+        if self.field == "deadline":
+            value, low, high = task.deadline_ordinal, deadline_ordinal(self.low), deadline_ordinal(self.high)
+            if value is None:
+                return False
+        else:
+            value, low, high = getattr(task, self.field), self.low, self.high
+
+        return (low is None or low <= value) and (high is None or value <= high)
+
+
+@dataclass(frozen=True, init=False)
+class And:
+    """Task matches every predicate"""
+
+    predicates: tuple
+
+    def __init__(self, *predicates) -> None:
+        object.__setattr__(self, "predicates", predicates)
+
+    def matches(self, task: Task) -> bool:
+        return all(predicate.matches(task) for predicate in self.predicates)
+
+
+@dataclass(frozen=True, init=False)
+class Or:
+    """Task matches at least one predicate"""
+
+    predicates: tuple
+
+    def __init__(self, *predicates) -> None:
+        object.__setattr__(self, "predicates", predicates)
+
+    def matches(self, task: Task) -> bool:
+        return any(predicate.matches(task) for predicate in self.predicates)
+
+
+def before(field: str, value: str | int) -> Between:
+    """Task field is not greater than value"""
+
+    return Between(field, high=value)
+
+
+def after(field: str, value: str | int) -> Between:
+    """Task field is not less than value"""
+
+    return Between(field, low=value)
+
+
+Predicate = Eq | Contains | Between | And | Or
+
+
+def plan(predicate: Predicate, indexes: dict[str, FieldIndex | DeadlineIndex | TextIndex],
+         tasks: dict[int, Task]) -> set[int] | None:
+    """Get ids of tasks which may match predicate using indexes
+
+    Returned ids are candidates only, every one of them must still be checked
+    with predicate.matches(). And uses every child it can answer and
+    intersects results smallest first, Or can use indexes only if every child can.
+
+    Args:
+        predicate (Predicate): query predicate
+        indexes (dict[str, FieldIndex | DeadlineIndex | TextIndex]): secondary indexes by task field
+        tasks (dict[int, Task]): Task objects by id
+
+    Returns:
+        set[int] | None: candidate ids OR None if whole task list must be scanned
+    """
+
+    match predicate:
+        case Eq(field="id", value=value):
+            return {value} if value in tasks else set()
+
+        case Eq(field=field, value=value) if isinstance(indexes.get(field), FieldIndex):
+            return indexes[field].lookup(value)
+
+        case Between(field="deadline", low=low, high=high) if isinstance(indexes.get("deadline"), DeadlineIndex):
+            low, high = deadline_ordinal(low), deadline_ordinal(high)
+            return set(indexes["deadline"].range(low, high))
+
+        case Contains(field=field, text=text) if field in TextIndex.fields and isinstance(indexes.get("text"), TextIndex):
+            return indexes["text"].candidates(field, text)
+
+        case And(predicates=predicates):
+            planned = sorted((ids for ids in (plan(child, indexes, tasks) for child in predicates) if ids is not None),
+                             key=len)
+            return set(planned[0]).intersection(*planned[1:]) if planned else None
+
+        case Or(predicates=predicates):
+            planned = [plan(child, indexes, tasks) for child in predicates]
+            return set().union(*planned) if planned and None not in planned else None
+
+    return None
+
+
+def sort_key(fields: tuple[str, ...]):
+    """Get sort key function for task fields
+
+    Priority is ordered from high to low, deadline as date with non-date
+    deadlines last, other fields by value.
+
+    Args:
+        fields (tuple[str, ...]): task fields, first one is most significant
+
+    Returns:
+        Callable[[Task], tuple]: sort key
+    """
+
+    def field_key(task: Task, field: str):
+        if field == "priority":
+            return PRIORITY_ORDER.get(task.priority, len(PRIORITY_ORDER)), task.priority
+        if field == "deadline":
+            ordinal = task.deadline_ordinal
+            return ordinal is None, ordinal or 0, task.deadline
+
+        return getattr(task, field)
+
+    return lambda task: tuple(field_key(task, field) for field in fields)
+
+
+def run_query(tasks: dict[int, Task], indexes: dict[str, FieldIndex | DeadlineIndex | TextIndex], where: Predicate = None,
+              sort_by: str | Iterable[str] = "id", reverse: bool = False, limit: int = None) -> list[Task]:
+    """Filter, sort and cut tasks
+
+    With limit only limit best tasks are kept in a heap instead of sorting all
+    found ones.
+
+    Args:
+        tasks (dict[int, Task]): Task objects by id
+        indexes (dict[str, FieldIndex | DeadlineIndex | TextIndex]): secondary indexes by task field
+        where (Predicate, optional): filter, all tasks if None. Defaults to None.
+        sort_by (str | Iterable[str], optional): task field(s) to sort by. Defaults to "id".
+        reverse (bool, optional): sort in descending order. Defaults to False.
+        limit (int, optional): maximum number of tasks, all if None. Defaults to None.
+
+    Returns:
+        list[Task]: found Task objects
+    """
+
+    # Use indexes before falling back to scan of all tasks
+    candidates = plan(where, indexes, tasks) if where is not None else None
+    found = tasks.values() if candidates is None else (tasks[id] for id in candidates)
+
+    if where is not None:
+        found = (task for task in found if where.matches(task))
+
+    key = sort_key((sort_by,) if isinstance(sort_by, str) else tuple(sort_by))
+
+    if limit is not None:
+        return (nlargest if reverse else nsmallest)(limit, found, key=key)
+
+    return sorted(found, key=key, reverse=reverse)
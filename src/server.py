@@ -0,0 +1,304 @@
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, loads
+from threading import Lock
+from urllib.parse import parse_qsl, urlsplit
+
+from src.task import Task, validate_task_data
+from src.task_manager import CHANGEABLE_FIELDS, TaskManager
+
+
+# Largest accepted request body
+MAX_BODY_SIZE = 16 << 20
+
+
+def to_json(result: Task | list | str | None):
+    """Convert TaskManager result to json value
+
+    Args:
+        result (Task | list | str | None): Task object, list of them OR failure description
+
+    Returns:
+        dict | list: task data, list of task data OR {"error": description}
+    """
+
+    if isinstance(result, Task):
+        return result.to_dict()
+    if isinstance(result, list):
+        return [to_json(item) for item in result]
+    if isinstance(result, str):
+        return {"error": result}
+
+    return result
+
+
+def execute(task_manager: TaskManager, operation: dict) -> tuple[HTTPStatus, dict | list]:
+    """Run one operation described by json object without saving
+
+    Operations look like {"op": "add", "title": ..., "description": ..., "category": ...,
+    "deadline": ..., "priority": ...}, {"op": "remove", "id": 1} OR {"op": "remove", "category": ...},
+    {"op": "change", "id": 1, "title": ...}, {"op": "status", "id": 1},
+    {"op": "find", "title": ..., "match": "all"} and {"op": "show"}.
+
+    Args:
+        task_manager (TaskManager): task manager
+        operation (dict): operation name and arguments
+
+    Returns:
+        tuple[HTTPStatus, dict | list]: response status and json result
+    """
+
+    if not isinstance(operation, dict):
+        return HTTPStatus.BAD_REQUEST, {"error": "operation must be json object"}
+
+    match operation.get("op"):
+        case "add":
+            error = validate_task_data(operation)
+            if error is None and not all(isinstance(operation.get(field), str) for field in CHANGEABLE_FIELDS):
+                error = f"fields {', '.join(CHANGEABLE_FIELDS)} are required"
+            if error is not None:
+                return HTTPStatus.BAD_REQUEST, {"error": error}
+
+            result = task_manager.add(*(operation[field] for field in CHANGEABLE_FIELDS))
+            status = HTTPStatus.CREATED
+
+        case "remove" | "change" | "status" if "id" in operation and not isinstance(operation["id"], int):
+            return HTTPStatus.BAD_REQUEST, {"error": "id must be integer"}
+
+        case "remove":
+            if not operation.get("id") and not operation.get("category"):
+                return HTTPStatus.BAD_REQUEST, {"error": "id or category is required"}
+
+            result = task_manager.remove(id=operation.get("id"), category=operation.get("category"))
+            status = HTTPStatus.OK
+
+        case "change":
+            fields = {field: operation.get(field) for field in CHANGEABLE_FIELDS}
+            error = validate_task_data(fields, partial=True)
+            if error is not None:
+                return HTTPStatus.BAD_REQUEST, {"error": error}
+
+            result = task_manager.change(operation.get("id"), **fields)
+            status = HTTPStatus.OK
+
+        case "status":
+            result = task_manager.status(operation.get("id"))
+            status = HTTPStatus.OK
+
+        # Nothing found is an empty list, not an error
+        case "find":
+            filters = {field: operation.get(field) for field in ("id", "title", "category", "priority", "status")}
+            result = task_manager.find(**filters, match=operation.get("match", "any"))
+            return HTTPStatus.OK, to_json(result) if isinstance(result, list) else []
+
+        case "show":
+            result = task_manager.show()
+            return HTTPStatus.OK, to_json(result) if isinstance(result, list) else []
+
+        case op:
+            return HTTPStatus.BAD_REQUEST, {"error": f"unknown operation '{op}'"}
+
+    if isinstance(result, str):
+        status = HTTPStatus.BAD_REQUEST if operation["op"] == "add" else HTTPStatus.NOT_FOUND
+
+    return status, to_json(result)
+
+
+class TaskServer(ThreadingHTTPServer):
+    """HTTP server sharing one TaskManager between all connections
+
+    Operations run one at a time under a lock, tasks stay in memory between
+    requests and every request (or whole batch) is saved with one flush
+    before response is sent.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], task_manager: TaskManager) -> None:
+        """Bind server to address
+
+        Args:
+            address (tuple[str, int]): host and port, port 0 picks free one
+            task_manager (TaskManager): task manager, its flush policy is replaced
+        """
+
+        super().__init__(address, TaskRequestHandler)
+        self.task_manager = task_manager
+        self.lock = Lock()
+
+        # Changes are saved once per request by run()
+        task_manager.flush_policy = "exit"
+
+    def run(self, operations: list[dict]) -> list[tuple[HTTPStatus, dict | list]]:
+        """Run operations and save their changes once
+
+        Args:
+            operations (list[dict]): operations accepted by execute()
+
+        Returns:
+            list[tuple[HTTPStatus, dict | list]]: status and json result of every operation
+        """
+
+        with self.lock:
+            results = [execute(self.task_manager, operation) for operation in operations]
+            self.task_manager.flush()
+
+        return results
+
+
+class TaskRequestHandler(BaseHTTPRequestHandler):
+    """JSON API over TaskManager
+
+    GET    /tasks                        - all tasks
+    GET    /tasks?title=...&match=all    - find tasks
+    GET    /tasks/<id>                   - one task
+    POST   /tasks                        - add task from json body
+    PATCH  /tasks/<id>                   - change task with fields from json body
+    POST   /tasks/<id>/status            - switch task status
+    DELETE /tasks/<id>                   - remove task
+    DELETE /tasks?category=...           - remove tasks of category
+    POST   /batch                        - run json list of operations (see execute) with one save
+
+    HTTP/1.1 keeps connection open between requests, pipelined requests are
+    answered in order.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "TaskManager"
+
+    # Small responses must not wait for ACK of previous ones
+    disable_nagle_algorithm = True
+
+    server: TaskServer
+
+    def do_GET(self) -> None:
+        path, query = self.__route()
+
+        match path:
+            case ["tasks"] if query:
+                self.__respond(*self.server.run([{"op": "find", **query}])[0])
+            case ["tasks"]:
+                self.__respond(*self.server.run([{"op": "show"}])[0])
+            case ["tasks", id] if id.isdigit():
+                status, result = self.server.run([{"op": "find", "id": int(id)}])[0]
+                if result:
+                    self.__respond(status, result[0])
+                else:
+                    self.__respond(HTTPStatus.NOT_FOUND, {"error": f"No task with ID '{id}'"})
+            case _:
+                self.__respond(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+
+    def do_POST(self) -> None:
+        path, _ = self.__route()
+        body = self.__read_body()
+        if body is None:
+            return
+
+        match path:
+            case ["tasks"] if isinstance(body, dict):
+                self.__respond(*self.server.run([{**body, "op": "add"}])[0])
+            case ["tasks", id, "status"] if id.isdigit():
+                self.__respond(*self.server.run([{"op": "status", "id": int(id)}])[0])
+            case ["batch"] if isinstance(body, list):
+                results = self.server.run(body)
+                self.__respond(HTTPStatus.OK, [{"status": status.value, "result": result} for status, result in results])
+            case ["tasks"] | ["batch"]:
+                self.__respond(HTTPStatus.BAD_REQUEST, {"error": "wrong request body"})
+            case _:
+                self.__respond(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+
+    def do_PATCH(self) -> None:
+        path, _ = self.__route()
+        body = self.__read_body()
+        if body is None:
+            return
+
+        match path:
+            case ["tasks", id] if id.isdigit() and isinstance(body, dict):
+                self.__respond(*self.server.run([{**body, "op": "change", "id": int(id)}])[0])
+            case _:
+                self.__respond(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+
+    def do_DELETE(self) -> None:
+        path, query = self.__route()
+
+        match path:
+            case ["tasks", id] if id.isdigit():
+                self.__respond(*self.server.run([{"op": "remove", "id": int(id)}])[0])
+            case ["tasks"] if "category" in query:
+                self.__respond(*self.server.run([{"op": "remove", "category": query["category"]}])[0])
+            case _:
+                self.__respond(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+
+    def __route(self) -> tuple[list[str], dict]:
+        """Split request path into parts and query into dict
+
+        Returns:
+            tuple[list[str], dict]: path parts and query parameters
+        """
+
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+
+        # Ids are numbers in json body, so they are in query as well
+        if query.get("id", "").isdigit():
+            query["id"] = int(query["id"])
+
+        return [part for part in url.path.split("/") if part], query
+
+    def __read_body(self) -> dict | list | None:
+        """Read json request body, respond with error if it is wrong
+
+        Returns:
+            dict | list | None: decoded body OR None if error was sent
+        """
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True
+            self.__respond(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "request body is too large"})
+            return None
+
+        try:
+            return loads(self.rfile.read(length)) if length else dict()
+        except ValueError:
+            self.__respond(HTTPStatus.BAD_REQUEST, {"error": "request body is not json"})
+            return None
+
+    def __respond(self, status: HTTPStatus, result: dict | list) -> None:
+        """Send json response with length, so connection can be kept open
+
+        Args:
+            status (HTTPStatus): response status
+            result (dict | list): json result
+        """
+
+        body = dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # Access log to stderr costs more than request itself
+        pass
+
+
+def serve(task_manager: TaskManager, host: str = "127.0.0.1", port: int = 8080) -> None:
+    """Serve JSON API until interrupted, then save changes
+
+    Args:
+        task_manager (TaskManager): task manager
+        host (str, optional): address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): port to listen on. Defaults to 8080.
+    """
+
+    with TaskServer((host, port), task_manager) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            task_manager.close()
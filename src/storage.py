@@ -0,0 +1,846 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from json import JSONDecodeError, JSONDecoder, dumps, load, loads
+from os import getpid, replace, stat
+from os.path import abspath, dirname, exists, getsize, splitext
+from shutil import copyfile
+import os
+from itertools import islice
+from dataclasses import astuple, replace as replace_fields
+from zlib import crc32
+import sqlite3
+import re
+
+from src.task import COLUMNS, Task
+
+# Advisory file locks are not available on Windows
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Journal records address tasks by stable id since version 2
+JOURNAL_VERSION = 2
+
+
+def apply_record(tasks: dict[int, Task], record: dict, positional: bool = False) -> Task:
+    """Apply one mutation record to tasks
+
+    Records are produced by TaskManager for every change and look like:
+    {"op": "add", "task": {...}}, {"op": "change", "id": 1, "fields": {...}},
+    {"op": "status", "id": 1, "status": "Done"} or {"op": "remove", "id": 1}
+
+    Args:
+        tasks (dict[int, Task]): Task objects by id, changed in place
+        record (dict): mutation record
+        positional (bool, optional): record ids are positions (journals written before ids became stable).
+            Defaults to False.
+
+    Returns:
+        Task: added, changed or removed task
+    """
+
+    id = record.get("id")
+    if positional and id is not None:
+        id = next(islice(iter(tasks), id - 1, None))
+
+    match record["op"]:
+        case "add":
+            task = Task.from_dict(record["task"])
+
+            # Positional ids of later tasks may be taken by tasks kept after removals
+            if positional:
+                task = replace_fields(task, id=next(reversed(tasks), 0) + 1)
+
+            tasks[task.id] = task
+
+        # Tasks are immutable, changed task replaces the old one
+        case "change":
+            task = replace_fields(tasks[id], **record["fields"])
+            tasks[id] = task
+
+        case "status":
+            task = replace_fields(tasks[id], status=record["status"])
+            tasks[id] = task
+
+        case "remove":
+            task = tasks.pop(id)
+
+        case op:
+            raise ValueError(f"Unknown record operation '{op}'")
+
+    return task
+
+
+def parse_tasks(data: list | dict) -> tuple[dict[int, Task], int]:
+    """Get tasks and last id from save file content
+
+    Save file holds {"last_id": 3, "tasks": [...]}. Older save files hold only
+    list of tasks with positional ids, their last id is the biggest one.
+
+    Args:
+        data (list | dict): decoded save file
+
+    Returns:
+        tuple[dict[int, Task], int]: Task objects by id and last task id
+    """
+
+    task_list: list[dict] = data if isinstance(data, list) else data["tasks"]
+    tasks = {task["id"]: Task.from_dict(task) for task in task_list}
+    last_id = max(tasks, default=0) if isinstance(data, list) else data["last_id"]
+
+    return tasks, last_id
+
+
+def iter_json_tasks(path: str, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """Read tasks from save file one by one without parsing whole file
+
+    File is read in chunks, every task object is decoded as soon as it is
+    complete, so first tasks are available in constant time.
+
+    Args:
+        path (str): path to save file in any format accepted by parse_tasks
+        chunk_size (int, optional): characters read at once. Defaults to 64 KiB.
+
+    Yields:
+        Iterator[dict]: task data
+    """
+
+    decoder = JSONDecoder()
+
+    with open(path, "r", encoding="utf-8") as file:
+        buffer = file.read(chunk_size)
+        position = None
+
+        # Find opening bracket of task list, it follows "tasks" key in current format
+        while position is None:
+            start = buffer.lstrip()[:1]
+            if not start:
+                return
+
+            key = buffer.find('"tasks"') if start == "{" else 0
+            bracket = buffer.find("[", key) if key != -1 else -1
+
+            if bracket != -1:
+                position = bracket + 1
+            else:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"No task list in save file '{path}'")
+                buffer += chunk
+
+        while True:
+            # Skip separators between tasks
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+
+            if position < len(buffer) and buffer[position] == "]":
+                return
+
+            try:
+                task, end = decoder.raw_decode(buffer, position)
+            except JSONDecodeError:
+                task = None
+
+            # Task is not read completely yet
+            if task is None or end == len(buffer):
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    if task is None:
+                        raise ValueError(f"Save file '{path}' is corrupted")
+                else:
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+
+            yield task
+            position = end
+
+
+def dump_tasks(tasks: dict[int, Task], last_id: int, indent: int = None, generation: int = None) -> bytes:
+    """Serialise tasks to save file content
+
+    Args:
+        tasks (dict[int, Task]): Task objects by id
+        last_id (int): last given task id
+        indent (int, optional): pretty print with indent, compact if None. Defaults to None.
+        generation (int, optional): save counter written first in file, omitted if None. Defaults to None.
+
+    Returns:
+        bytes: utf-8 encoded json
+    """
+
+    data = {"last_id": last_id, "tasks": [task.to_dict() for task in tasks.values()]}
+    if generation is not None:
+        data = {"generation": generation, **data}
+
+    separators = (",", ":") if indent is None else None
+
+    return dumps(data, indent=indent, separators=separators, ensure_ascii=False).encode("utf-8")
+
+
+def write_atomic(path: str, data: bytes, fsync: bool = True, backups: int = 0) -> None:
+    """Replace file content so that it is either old or new one after crash
+
+    Data is written to temporary file, flushed to disk and moved over path.
+    Old content is kept in '<path>.bak.1' ... '<path>.bak.<backups>', newest first.
+
+    Args:
+        path (str): destination file
+        data (bytes): file content
+        fsync (bool, optional): wait until data reaches disk. Defaults to True.
+        backups (int, optional): number of old versions to keep. Defaults to 0.
+    """
+
+    temp_path = f"{path}.{getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(data)
+
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+    except BaseException:
+        # Partly written file must not be left next to save file
+        if exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    if backups and exists(path):
+        # Shift old backups, the oldest one is overwritten
+        for number in range(backups - 1, 0, -1):
+            if exists(f"{path}.bak.{number}"):
+                replace(f"{path}.bak.{number}", f"{path}.bak.{number + 1}")
+
+        # Hard link keeps current file in place until it is replaced
+        if exists(f"{path}.bak.1"):
+            os.remove(f"{path}.bak.1")
+        try:
+            os.link(path, f"{path}.bak.1")
+        except OSError:
+            copyfile(path, f"{path}.bak.1")
+
+    replace(temp_path, path)
+
+    # Rename itself is durable only after directory is flushed, not possible on Windows
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        directory = os.open(dirname(abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+def file_signature(path: str) -> tuple[int, int] | None:
+    """Get signature used to detect changes of file made outside of this process
+
+    Args:
+        path (str): file path
+
+    Returns:
+        tuple[int, int] | None: modification time in nanoseconds and size OR None if file is missing
+    """
+
+    try:
+        file_stat = stat(path)
+    except FileNotFoundError:
+        return None
+
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def read_generation(path: str) -> int:
+    """Get save counter from the beginning of save file without reading whole file
+
+    Args:
+        path (str): path to save file
+
+    Returns:
+        int: generation, 0 for empty, missing or older save files
+    """
+
+    try:
+        with open(path, "rb") as file:
+            head = file.read(64)
+    except FileNotFoundError:
+        return 0
+
+    match = re.match(rb'\s*\{\s*"generation"\s*:\s*(\d+)', head)
+    return int(match[1]) if match else 0
+
+
+class StaleStoreError(Exception):
+    """Store was saved by another process after it was loaded"""
+
+
+class FileLock:
+    """Advisory lock shared by all processes working with one store
+
+    Lock is taken on separate '<path>.lock' file, because store files are
+    replaced on save and lock on the old file would not stop anybody. Locks
+    can be nested in one process: inner lock keeps outer one, only shared
+    lock is upgraded to exclusive for inner exclusive lock. Lock is not
+    thread safe. Without fcntl (Windows) locking does nothing.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Create lock, lock file is opened on first use
+
+        Args:
+            path (str): path to store file
+        """
+
+        self.path = path + ".lock"
+        self.__file = None
+        self.__mode = None
+
+    def shared(self):
+        """Lock for reading, many processes may hold it at once"""
+
+        return self.__hold(fcntl.LOCK_SH if fcntl else None)
+
+    def exclusive(self):
+        """Lock for writing, only one process may hold it"""
+
+        return self.__hold(fcntl.LOCK_EX if fcntl else None)
+
+    @contextmanager
+    def __hold(self, mode: int | None):
+        previous = self.__mode
+
+        if mode is not None and previous in (None, fcntl.LOCK_SH) and previous != mode:
+            if self.__file is None:
+                self.__file = open(self.path, "a")
+
+            fcntl.flock(self.__file, mode)
+            self.__mode = mode
+
+        try:
+            yield
+        finally:
+            if self.__mode != previous:
+                # Outer shared lock is restored after inner exclusive one
+                if previous is not None:
+                    fcntl.flock(self.__file, previous)
+                else:
+                    fcntl.flock(self.__file, fcntl.LOCK_UN)
+                    self.__file.close()
+                    self.__file = None
+
+                self.__mode = previous
+
+
+class JsonStore:
+    """Keep all tasks in one compact json file, atomically replaced on every save
+
+    Every save increases generation written at the beginning of the file.
+    Save raises StaleStoreError if generation in file is not the one that
+    was loaded, so changes of another process are not overwritten.
+    """
+
+    def __init__(self, path: str, fsync: bool = True, backups: int = 0) -> None:
+        """Create save file if not exist
+
+        Args:
+            path (str): path to save file
+            fsync (bool, optional): wait until saved data reaches disk. Defaults to True.
+            backups (int, optional): number of previous save files to keep. Defaults to 0.
+        """
+
+        self.path = path
+        self.fsync = fsync
+        self.backups = backups
+        self.lock = FileLock(path)
+        self.generation = 0
+
+        if not exists(path):
+            save_file = open(path, "x")
+            save_file.close()
+
+    def signature(self) -> tuple:
+        """Get signature of store files, changes when store is changed
+
+        Returns:
+            tuple: files signature
+        """
+
+        return file_signature(self.path)
+
+    def load(self) -> tuple[dict[int, Task], int]:
+        """Load tasks from save file
+
+        Returns:
+            tuple[dict[int, Task], int]: Task objects by id and last task id
+        """
+
+        # Save file is empty
+        if self.signature()[1] == 0:
+            self.generation = 0
+            return dict(), 0
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            data = load(file)
+
+        self.generation = data.get("generation", 0) if isinstance(data, dict) else 0
+        return parse_tasks(data)
+
+    def iter_tasks(self) -> Iterator[Task]:
+        """Read tasks from save file one by one
+
+        Yields:
+            Iterator[Task]: Task objects in id order
+        """
+
+        for task in iter_json_tasks(self.path):
+            yield Task.from_dict(task)
+
+    def save(self, tasks: dict[int, Task], last_id: int, records: list[dict]) -> None:
+        """Save tasks to save file
+
+        Args:
+            tasks (dict[int, Task]): Task objects by id
+            last_id (int): last given task id
+            records (list[dict]): mutation records since last save, not used
+        """
+
+        if read_generation(self.path) != self.generation:
+            raise StaleStoreError(f"Save file '{self.path}' was changed by another process")
+
+        # Old content stays in place until new one is completely written
+        generation = self.generation + 1
+        write_atomic(self.path, dump_tasks(tasks, last_id, generation=generation), self.fsync, self.backups)
+        self.generation = generation
+
+
+class JournalStore:
+    """Keep tasks as json snapshot plus append-only journal of mutation records
+
+    Every save appends one json line to '<path>.journal' holding one record or
+    {"op": "batch", "records": [...]}, so write cost depends on size of
+    changes, not on number of tasks, and half-written save is lost as a whole.
+    When journal grows over compact_threshold records it is folded into a new
+    snapshot.
+
+    First journal line holds crc32 of snapshot it applies to and journal
+    version (journals without version address tasks by position). If process dies
+    after snapshot was replaced but before journal was reset, the stale journal
+    no longer matches the snapshot and is skipped, so no record is applied twice.
+    Half-written last line (crash during append) is ignored as well.
+
+    Snapshot holds generation increased on every compaction. Save raises
+    StaleStoreError if snapshot generation or journal length is not the
+    one this store loaded or wrote itself.
+    """
+
+    def __init__(self, path: str, compact_threshold: int = 1000, fsync: bool = True, backups: int = 0) -> None:
+        """Create snapshot file if not exist
+
+        Args:
+            path (str): path to snapshot file, same format as JsonStore save file
+            compact_threshold (int, optional): journal records before compaction. Defaults to 1000.
+            fsync (bool, optional): wait until saved data reaches disk. Defaults to True.
+            backups (int, optional): number of previous snapshots to keep. Defaults to 0.
+        """
+
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.backups = backups
+        self.lock = FileLock(path)
+        self.generation = 0
+
+        self.__base_crc = 0
+        self.__journal_size = 0
+        self.__journal_bytes = 0
+
+        if not exists(path):
+            save_file = open(path, "x")
+            save_file.close()
+
+    def signature(self) -> tuple:
+        """Get signature of store files, changes when store is changed
+
+        Returns:
+            tuple: files signature
+        """
+
+        return file_signature(self.path), file_signature(self.journal_path)
+
+    def load(self) -> tuple[dict[int, Task], int]:
+        """Load snapshot and replay journal on top of it
+
+        Returns:
+            tuple[dict[int, Task], int]: Task objects by id and last task id
+        """
+
+        with open(self.path, "rb") as file:
+            snapshot = file.read()
+
+        self.__base_crc = crc32(snapshot)
+        data = loads(snapshot) if snapshot else {"last_id": 0, "tasks": []}
+        tasks, last_id = parse_tasks(data)
+        self.generation = data.get("generation", 0) if isinstance(data, dict) else 0
+        self.__journal_size = 0
+        self.__journal_bytes = 0
+
+        if not exists(self.journal_path):
+            return tasks, last_id
+
+        with open(self.journal_path, "rb") as journal:
+            content = journal.read()
+
+        self.__journal_bytes = len(content)
+        lines = content.decode("utf-8").splitlines()
+
+        # Journal was written for another snapshot and is already folded in it
+        header = loads(lines[0]) if lines else dict()
+        if header.get("crc") != self.__base_crc:
+            return tasks, last_id
+
+        positional = header.get("version", 1) < JOURNAL_VERSION
+        for line in lines[1:]:
+            try:
+                record = loads(line)
+            except ValueError:
+                break  # Torn write at the end of journal
+
+            for record in record["records"] if record["op"] == "batch" else (record,):
+                task = apply_record(tasks, record, positional)
+                last_id = max(last_id, task.id)
+                self.__journal_size += 1
+
+        # Old journal can not be extended with stable id records
+        if positional:
+            self.compact(tasks, last_id)
+
+        return tasks, last_id
+
+    def save(self, tasks: dict[int, Task], last_id: int, records: list[dict]) -> None:
+        """Append mutation records to journal or compact it into new snapshot
+
+        Args:
+            tasks (dict[int, Task]): Task objects by id after records were applied
+            last_id (int): last given task id
+            records (list[dict]): mutation records since last save
+        """
+
+        journal_signature = file_signature(self.journal_path)
+        if (read_generation(self.path) != self.generation
+                or (journal_signature[1] if journal_signature else 0) != self.__journal_bytes):
+            raise StaleStoreError(f"Save file '{self.path}' was changed by another process")
+
+        if self.__journal_size + len(records) >= self.compact_threshold:
+            self.compact(tasks, last_id)
+            return
+
+        # Start journal for current snapshot
+        if not exists(self.journal_path):
+            write_atomic(self.journal_path, self.__header().encode("utf-8"), self.fsync)
+
+        # Records of one save are one line, so torn write loses all of them or none
+        record = records[0] if len(records) == 1 else {"op": "batch", "records": records}
+        line = dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.journal_path, "ab") as journal:
+            journal.write(line.encode("utf-8"))
+
+            if self.fsync:
+                journal.flush()
+                os.fsync(journal.fileno())
+
+        self.__journal_size += len(records)
+        self.__journal_bytes = getsize(self.journal_path)
+
+    def compact(self, tasks: dict[int, Task], last_id: int) -> None:
+        """Write tasks as new snapshot and start empty journal
+
+        Args:
+            tasks (dict[int, Task]): Task objects by id
+            last_id (int): last given task id
+        """
+
+        snapshot = dump_tasks(tasks, last_id, generation=self.generation + 1)
+        write_atomic(self.path, snapshot, self.fsync, self.backups)
+        self.generation += 1
+
+        self.__base_crc = crc32(snapshot)
+        self.__journal_size = 0
+        header = self.__header().encode("utf-8")
+        write_atomic(self.journal_path, header, self.fsync)
+        self.__journal_bytes = len(header)
+
+    def __header(self) -> str:
+        """Get first journal line for current snapshot
+
+        Returns:
+            str: json line
+        """
+
+        return dumps({"crc": self.__base_crc, "version": JOURNAL_VERSION}) + "\n"
+
+
+class SqliteTaskStore:
+    """Keep tasks in SQLite database with indexed search
+
+    Database has indexes on category, priority, status and deadline, and FTS5
+    trigram index over title and description (when SQLite supports it), so
+    find() runs indexed query instead of scanning all tasks. Mutation records
+    are applied as single statements, so write cost does not depend on number
+    of tasks. New database is filled once from existing json save file.
+
+    Every save increases generation kept in meta table, save raises
+    StaleStoreError if it is not the loaded one.
+    """
+
+    def __init__(self, path: str, database: str = None) -> None:
+        """Open database, create schema and migrate tasks from json save file
+
+        Args:
+            path (str): path to json save file, used only for migration
+            database (str, optional): path to database. Defaults to save file path with '.db' extension.
+        """
+
+        self.path = path
+        self.database = database or splitext(path)[0] + ".db"
+        self.lock = FileLock(self.database)
+        self.generation = 0
+
+        is_new = not exists(self.database)
+        self.connection = sqlite3.connect(self.database)
+        self.fts = self.__create_schema()
+
+        if is_new and exists(path) and getsize(path):
+            self.__migrate()
+
+    def __create_schema(self) -> bool:
+        """Create tasks table, indexes and full text search table
+
+        Returns:
+            bool: True if full text search is available
+        """
+
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    deadline TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    status TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS tasks_category ON tasks (category);
+                CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority);
+                CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+                CREATE INDEX IF NOT EXISTS tasks_deadline ON tasks (deadline);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+            """)
+
+            # Trigram tokenizer gives substring semantics, requires SQLite 3.34+
+            try:
+                self.connection.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                        title, description, content='tasks', content_rowid='id',
+                        tokenize='trigram case_sensitive 1'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                        INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                        VALUES ('delete', old.id, old.title, old.description);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE ON tasks BEGIN
+                        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                        VALUES ('delete', old.id, old.title, old.description);
+                        INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+                    END;
+                """)
+            except sqlite3.OperationalError:
+                return False
+
+        return True
+
+    def __migrate(self) -> None:
+        """Copy tasks from json save file to database"""
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            tasks, last_id = parse_tasks(load(file))
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (astuple(task) for task in tasks.values()))
+            self.__set_last_id(last_id)
+
+    def __set_last_id(self, last_id: int) -> None:
+        """Remember last given task id
+
+        Args:
+            last_id (int): last given task id
+        """
+
+        self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('last_id', ?)", (last_id,))
+
+    def __get_generation(self) -> int:
+        """Get number of saves made to database
+
+        Returns:
+            int: generation
+        """
+
+        generation = self.connection.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return generation[0] if generation else 0
+
+    def signature(self) -> tuple:
+        """Get signature of store files, changes when store is changed
+
+        Returns:
+            tuple: files signature
+        """
+
+        return file_signature(self.database)
+
+    def load(self) -> tuple[dict[int, Task], int]:
+        """Load tasks from database
+
+        Returns:
+            tuple[dict[int, Task], int]: Task objects by id and last task id
+        """
+
+        rows = self.connection.execute(f"SELECT {', '.join(COLUMNS)} FROM tasks ORDER BY id")
+        tasks = {row[0]: Task(*row) for row in rows}
+
+        # Databases created before ids became stable have no last id
+        last_id = self.connection.execute("SELECT value FROM meta WHERE key = 'last_id'").fetchone()
+        last_id = last_id[0] if last_id else max(tasks, default=0)
+        self.generation = self.__get_generation()
+
+        return tasks, last_id
+
+    def iter_tasks(self) -> Iterator[Task]:
+        """Read tasks from database one by one
+
+        Yields:
+            Iterator[Task]: Task objects in id order
+        """
+
+        for row in self.connection.execute(f"SELECT {', '.join(COLUMNS)} FROM tasks ORDER BY id"):
+            yield Task(*row)
+
+    def save(self, tasks: dict[int, Task], last_id: int, records: list[dict]) -> None:
+        """Apply mutation records to database in one transaction
+
+        Args:
+            tasks (dict[int, Task]): Task objects by id, not used
+            last_id (int): last given task id
+            records (list[dict]): mutation records since last save
+        """
+
+        with self.connection:
+            # Write lock is taken before generation is checked
+            self.connection.execute("BEGIN IMMEDIATE")
+            if self.__get_generation() != self.generation:
+                raise StaleStoreError(f"Database '{self.database}' was changed by another process")
+
+            for record in records:
+                self.__execute(record)
+
+            self.__set_last_id(last_id)
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (self.generation + 1,))
+
+        self.generation += 1
+
+    def __execute(self, record: dict) -> None:
+        """Run SQL statements for one mutation record
+
+        Args:
+            record (dict): mutation record
+        """
+
+        match record["op"]:
+            case "add":
+                self.connection.execute(
+                    "INSERT INTO tasks VALUES (:id, :title, :description, :category, :deadline, :priority, :status)",
+                    record["task"])
+
+            case "change":
+                fields = {key: value for key, value in record["fields"].items() if key in COLUMNS[1:]}
+                if fields:
+                    assignments = ", ".join(f"{key} = :{key}" for key in fields)
+                    self.connection.execute(f"UPDATE tasks SET {assignments} WHERE id = :id",
+                                            fields | {"id": record["id"]})
+
+            case "status":
+                self.connection.execute("UPDATE tasks SET status = ? WHERE id = ?", (record["status"], record["id"]))
+
+            case "remove":
+                self.connection.execute("DELETE FROM tasks WHERE id = ?", (record["id"],))
+
+            case op:
+                raise ValueError(f"Unknown record operation '{op}'")
+
+    def find(self, field: str, value: str | int) -> list[Task]:
+        """Find tasks with indexed query, same rules as TaskManager.find for one field
+
+        Args:
+            field (str): id, title, category, priority or status
+            value (str | int): value to search
+
+        Returns:
+            list[Task]: Task objects ordered by id
+        """
+
+        columns = ", ".join("tasks." + column for column in COLUMNS)
+
+        match field:
+            case "id" | "category" | "priority" | "status":
+                rows = self.connection.execute(f"SELECT {columns} FROM tasks WHERE {field} = ? ORDER BY id", (value,))
+
+            # Trigram index needs at least 3 characters
+            case "title" | "description" if self.fts and len(value) >= 3:
+                phrase = '"' + value.replace('"', '""') + '"'
+                rows = self.connection.execute(f"""
+                    SELECT {columns} FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid
+                    WHERE tasks_fts MATCH ? ORDER BY tasks.id
+                """, (f"{field} : {phrase}",))
+
+            case "title" | "description":
+                rows = self.connection.execute(f"SELECT {columns} FROM tasks WHERE instr({field}, ?) ORDER BY id",
+                                               (value,))
+
+            case _:
+                raise ValueError(f"Unknown task field '{field}'")
+
+        return [Task(*row) for row in rows]
+
+    def close(self) -> None:
+        """Close database connection"""
+
+        self.connection.close()
+
+
+STORAGES = {
+    "json": JsonStore,
+    "journal": JournalStore,
+    "sqlite": SqliteTaskStore,
+}
+
+
+def open_store(storage: str, path: str, **options) -> JsonStore | JournalStore | SqliteTaskStore:
+    """Create storage backend by name
+
+    Args:
+        storage (str): one of STORAGES keys
+        path (str): path to save file
+        **options: backend specific arguments
+
+    Returns:
+        JsonStore | JournalStore | SqliteTaskStore: storage backend
+    """
+
+    if storage not in STORAGES:
+        raise ValueError(f"Unknown storage '{storage}', expected one of {tuple(STORAGES)}")
+
+    return STORAGES[storage](path, **options)
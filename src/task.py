@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from sys import intern
+import re
+
+
+# Task fields in the order they are stored
+COLUMNS = ("id", "title", "description", "category", "deadline", "priority", "status")
+
+# Values accepted from user input
+PRIORITIES = ("low", "medium", "high")
+DEADLINE_PATTERN = r'\d{4}-\d{2}-\d{2}'
+
+
+@lru_cache(maxsize=8192)
+def deadline_ordinal(deadline: str) -> int | None:
+    """Parse deadline like 2024-12-31 to proleptic Gregorian ordinal
+
+    Args:
+        deadline (str): Task's deadline
+
+    Returns:
+        int | None: date ordinal OR None if deadline is not a date
+    """
+
+    try:
+        return date.fromisoformat(deadline).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def validate_task_data(data: dict, partial: bool = False) -> str | None:
+    """Check deadline and priority of task data entered by user or read from file
+
+    Args:
+        data (dict): task data
+        partial (bool, optional): data holds only changed fields, missing ones are not checked. Defaults to False.
+
+    Returns:
+        str | None: failure description OR None if data is valid
+    """
+
+    if (not partial or data.get("deadline") is not None) and not re.fullmatch(DEADLINE_PATTERN, str(data.get("deadline"))):
+        return f"wrong deadline '{data.get('deadline')}'"
+    if (not partial or data.get("priority") is not None) and data.get("priority") not in PRIORITIES:
+        return f"wrong priority '{data.get('priority')}'"
+
+    return None
+
+
+@dataclass(slots=True, frozen=True)
+class Task:
+    """Task data, immutable so the same object can be kept in memory and returned to caller
+
+    Category, deadline, priority and status repeat on many tasks, so they are
+    interned and every task refers to one shared string instead of its own copy.
+    """
+
+    id: int
+    title: str
+    description: str
+    category: str
+    deadline: str
+    priority: str
+    status: str = "In progress"
+
+    def __post_init__(self):
+        # Frozen dataclass fields can be set only through object.__setattr__
+        if type(self.category) is str:
+            object.__setattr__(self, "category", intern(self.category))
+        if type(self.deadline) is str:
+            object.__setattr__(self, "deadline", intern(self.deadline))
+        if type(self.priority) is str:
+            object.__setattr__(self, "priority", intern(self.priority))
+        if type(self.status) is str:
+            object.__setattr__(self, "status", intern(self.status))
+
+    def __str__(self):
+        show_str = f"ID: {self.id}:\ntitle: {self.title}\ndescription: {self.description}\ncategory: {self.category}\ndeadline: {self.deadline}\npriority: {self.priority}\nstatus: {self.status}"
+        return show_str
+
+    @property
+    def deadline_ordinal(self) -> int | None:
+        """Deadline as date ordinal, None if deadline is not a date"""
+
+        return deadline_ordinal(self.deadline)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Task":
+        """Create Task from save file record, independent of key order
+
+        Args:
+            data (dict): task data by field name
+
+        Returns:
+            Task: Task object
+        """
+
+        return cls(data["id"], data["title"], data["description"], data["category"], data["deadline"],
+                   data["priority"], data.get("status", "In progress"))
+
+    def to_dict(self) -> dict:
+        """Get save file record of Task, faster than dataclasses.asdict
+
+        Returns:
+            dict: task data by field name
+        """
+
+        return {"id": self.id, "title": self.title, "description": self.description, "category": self.category,
+                "deadline": self.deadline, "priority": self.priority, "status": self.status}
@@ -1,21 +1,24 @@
-from dataclasses import dataclass, asdict
-from os.path import exists, getsize
-from json import dump, load
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import date, timedelta
+from heapq import nlargest
+from itertools import dropwhile, islice
+from threading import RLock, Timer
+from time import monotonic
+from os.path import exists
+import atexit
 
+from src.task import Task, deadline_ordinal
+from src.storage import StaleStoreError, open_store, apply_record, dump_tasks, write_atomic
+from src.indexes import INDEXED_FIELDS, DeadlineIndex, FieldIndex, TextIndex
+from src.query import Predicate, run_query
 
-@dataclass
-class Task:
-    id: int
-    title: str
-    description: str
-    category: str
-    deadline: str
-    priority: str
-    status: str = "In progress"
 
-    def __str__(self):
-        show_str = f"ID: {self.id}:\ntitle: {self.title}\ndescription: {self.description}\ncategory: {self.category}\ndeadline: {self.deadline}\npriority: {self.priority}\nstatus: {self.status}"
-        return show_str
+# When unsaved changes are written back to the save file
+FLUSH_POLICIES = ("immediate", "ops", "interval", "window", "exit")
+
+# Task fields set by user, in the order of add() arguments
+CHANGEABLE_FIELDS = ("title", "description", "category", "deadline", "priority")
 
 
 class TaskManager:
@@ -27,72 +30,368 @@ class TaskManager:
     4 swith status for existing task
     5 find tasks by id, title, category, priority or status
     6 show all saved tasks
+    7 add, remove, change or switch status for many tasks with one save
+    8 iterate over all or found tasks page by page
+    9 query tasks with combined predicates, sorting and limit
+    10 get tasks due in date range or overdue
+    11 search words in title and description
+    12 export all tasks to pretty printed json file
+
+    Tasks are loaded from the save file once and kept in memory. The file is
+    reloaded only when it was changed by someone else (detected by mtime and
+    size), and changes are written back according to the flush policy:
+
+    immediate - save after every change (default)
+    ops - save after every `flush_every` changes
+    interval - save on the first change after `flush_interval` seconds
+    window - save `flush_interval` seconds after the first unsaved change, in background
+    exit - save only on flush() or interpreter exit
+
+    Changes made inside `with task_manager.transaction():` are saved with one
+    write when the block ends, or undone if it raises, whatever the policy is.
+
+    Every change is described by a mutation record (see storage.apply_record),
+    so storage backends can persist only what changed instead of all tasks.
+
+    Task ids are stable: they are given in increasing order, never reused and
+    not changed when other tasks are removed. Tasks are kept in a dict by id,
+    so lookup, update and removal do not depend on number of tasks.
+
+    Many processes can work with one save file. Changes are made under
+    exclusive file lock and loads under shared one. If another process saved
+    while changes were waiting for deferred flush, they are applied again on
+    top of its tasks, so tasks added meanwhile get new ids.
     """
 
-    def __init__(self, save_file_path: str) -> None:
+    def __init__(self, save_file_path: str, storage: str = "json", flush_policy: str = "immediate",
+                 flush_every: int = 100, flush_interval: float = 5.0, **storage_options) -> None:
         """Create save file if not exist
 
         Args:
             save_file_path (str): path to save file
+            storage (str, optional): storage backend name, see storage.STORAGES. Defaults to "json".
+            flush_policy (str, optional): one of FLUSH_POLICIES. Defaults to "immediate".
+            flush_every (int, optional): changes between saves for "ops" policy. Defaults to 100.
+            flush_interval (float, optional): seconds between saves for "interval" and "window" policies.
+                Defaults to 5.0.
+            **storage_options: storage backend specific arguments
         """
 
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy '{flush_policy}', expected one of {FLUSH_POLICIES}")
+
         self.save_file = save_file_path
+        self.flush_policy = flush_policy
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self.__store = open_store(storage, save_file_path, **storage_options)
+
+        # In-memory copy of the save file
+        self.__tasks: dict[int, Task] | None = None
+        self.__last_id = 0
+        self.__signature: tuple | None = None
+
+        # Secondary indexes for exact match filters, deadline ranges and text search, built lazily after load
+        self.__indexes: dict[str, FieldIndex | DeadlineIndex | TextIndex] = {
+            field: FieldIndex(field) for field in INDEXED_FIELDS}
+        self.__indexes["deadline"] = DeadlineIndex()
+        self.__indexes["text"] = TextIndex()
+        self.__indexes_valid = False
 
-        if not exists(save_file_path):
-            save_file = open(save_file_path, "x")
-            save_file.close()
+        # Text index is costly to build, so it is kept next to save file
+        self.text_index_file = save_file_path + ".idx"
+        self.__text_index_changed = False
 
-    def __get_tasks_and_last_id(self) -> tuple[list[dict], int]:
-        """Get task list and last task id from save file
+        # Write-back state
+        self.__records: list[dict] = list()
+        self.__last_flush = monotonic()
+        self.__flush_timer: Timer | None = None
+
+        # Previous versions of tasks changed in open transaction, None outside of it
+        self.__undo: list[tuple[int, Task | None]] | None = None
+
+        # Background flush of "window" policy runs in another thread
+        self.__mutex = RLock()
+
+        # Deferred policies must not lose changes when the program ends
+        atexit.register(self.close)
+
+    def __get_tasks_and_last_id(self) -> tuple[dict[int, Task], int]:
+        """Get tasks and last task id, loading save file only if it has changed
 
         Returns:
-            tuple[list[dict], int]: Task objects and last task id
+            tuple[dict[int, Task], int]: Task objects by id and last task id
         """
 
-        # After removing all tasks, only brackets remained - clear them
-        if getsize(self.save_file) == 2:
-            file = open(self.save_file, "w")
-            file.close()
+        with self.__mutex:
+            signature = self.__store.signature()
+
+            # Use in-memory tasks if file is untouched or has unsaved changes
+            if self.__tasks is not None and (signature == self.__signature or self.__records):
+                return self.__tasks, self.__last_id
 
-        # Save file is empty
-        if getsize(self.save_file) == 0:
-            return list(), 0
+            # Save of another process is not seen half done
+            with self.__store.lock.shared():
+                self.__tasks, self.__last_id = self.__store.load()
+                self.__signature = self.__store.signature()
 
-        # Save file is not empty
-        with open(self.save_file, "r", encoding="utf-8") as file:
-            task_list: list[dict] = load(file)
-            last_id: int = task_list[-1].get('id')
+            self.__indexes_valid = False
 
-            return task_list, last_id
+            return self.__tasks, self.__last_id
 
-    def __save_tasks(self, task_list: list[dict]) -> None:
-        """Save task list to save file
+    @contextmanager
+    def __exclusive(self):
+        """Hold task manager against other threads and save file against other processes"""
+
+        with self.__mutex, self.__store.lock.exclusive():
+            yield
+
+    def __apply(self, record: dict) -> dict:
+        """Apply mutation record to in-memory tasks and indexes
 
         Args:
-            task_list (list[dict]): Task objects
+            record (dict): mutation record
+
+        Returns:
+            dict: added, changed or removed task
         """
 
-        # Rewrite file on save with new data
-        with open(self.save_file, "w", encoding="utf-8") as file:
-            dump(task_list, file, indent=4, ensure_ascii=False)
+        # Remember previous version to undo open transaction
+        if self.__undo is not None:
+            id = record["task"]["id"] if record["op"] == "add" else record["id"]
+            self.__undo.append((id, self.__tasks.get(id)))
+
+        # Changed task leaves indexes with old values
+        if record["op"] != "add":
+            self.__unindex(self.__tasks[record["id"]])
+
+        task = apply_record(self.__tasks, record)
+
+        if record["op"] != "remove":
+            self.__index(task)
+        if record["op"] == "add":
+            self.__last_id = task.id
+
+        self.__records.append(record)
+        return task
+
+    def __commit(self) -> None:
+        """Save applied mutation records according to flush policy"""
+
+        # Open transaction is saved when it ends
+        if self.__undo is not None:
+            return
 
-    def __reorder_id(self, task_list: list[dict]) -> list[dict]:
-        """Reorder id from beggining of task list
+        match self.flush_policy:
+            case "immediate":
+                self.flush()
+            case "ops" if len(self.__records) >= self.flush_every:
+                self.flush()
+            case "interval" if monotonic() - self.__last_flush >= self.flush_interval:
+                self.flush()
+            case "window" if self.__flush_timer is None and self.__records:
+                self.__flush_timer = Timer(self.flush_interval, self.__flush_window)
+                self.__flush_timer.daemon = True
+                self.__flush_timer.start()
+
+    def __flush_window(self) -> None:
+        """Save changes collected during window, called by timer"""
+
+        with self.__mutex:
+            self.__flush_timer = None
+            self.flush()
+
+    def __index(self, task: dict) -> None:
+        """Add task to secondary indexes
+
+        Args:
+            task (dict): Task object
+        """
+
+        if self.__indexes_valid:
+            for index in self.__indexes.values():
+                index.add(task)
+
+            self.__text_index_changed = True
+
+    def __unindex(self, task: dict) -> None:
+        """Remove task from secondary indexes
 
         Args:
-            task_list (list[dict]): Task objects
+            task (dict): Task object
+        """
+
+        if self.__indexes_valid:
+            for index in self.__indexes.values():
+                index.discard(task)
+
+            self.__text_index_changed = True
+
+    def __get_indexes(self) -> dict[str, FieldIndex | DeadlineIndex | TextIndex]:
+        """Get secondary indexes, building them after load
+
+        Saved text index is used if it was built for tasks in save file.
 
         Returns:
-            list[dict]: Task objects with reordered ids
+            dict[str, FieldIndex | DeadlineIndex | TextIndex]: indexes by task field
         """
 
-        for id, task in enumerate(task_list, start=1):
-            task['id'] = id
+        if not self.__indexes_valid:
+            for name, index in self.__indexes.items():
+                if name == "text" and not self.__records and index.load(self.text_index_file, self.__signature):
+                    self.__text_index_changed = False
+                    continue
 
-        return task_list
+                index.rebuild(self.__tasks.values())
+                self.__text_index_changed = self.__text_index_changed or name == "text"
 
-    def add(self, title: str, description: str, category: str, deadline: str, priority: str) -> Task | str:
-        """Create new Task and save it to json file
+            self.__indexes_valid = True
+
+        return self.__indexes
+
+    def flush(self) -> None:
+        """Write unsaved changes to save file"""
+
+        # Open transaction is saved when it ends
+        if not self.__records or self.__undo is not None:
+            return
+
+        with self.__exclusive():
+            try:
+                self.__store.save(self.__tasks, self.__last_id, self.__records)
+
+            # Another process saved first, repeat own changes on top of its tasks
+            except StaleStoreError:
+                self.__rebase()
+                self.__store.save(self.__tasks, self.__last_id, self.__records)
+
+            self.__signature = self.__store.signature()
+
+        self.__records = list()
+        self.__last_flush = monotonic()
+
+    def __rebase(self) -> None:
+        """Reload tasks and apply unsaved mutation records again
+
+        Added tasks get ids after the last id of reloaded tasks, records of
+        tasks removed by another process are dropped.
+        """
+
+        records = self.__records
+        self.__records = list()
+
+        self.__tasks, self.__last_id = self.__store.load()
+        self.__indexes_valid = False
+
+        # Ids of added tasks before and after rebase
+        new_ids = dict()
+
+        for record in records:
+            if record["op"] == "add":
+                new_ids[record["task"]["id"]] = self.__last_id + 1
+                record = {**record, "task": {**record["task"], "id": self.__last_id + 1}}
+            else:
+                record = {**record, "id": new_ids.get(record["id"], record["id"])}
+                if record["id"] not in self.__tasks:
+                    continue
+
+            self.__apply(record)
+
+    @contextmanager
+    def transaction(self):
+        """Apply changes in memory and save them with one write when block ends
+
+        If block raises, its changes are undone and nothing is saved. Other
+        processes and threads wait until block ends. Nested blocks are part
+        of the outer one. If the final save fails, changes stay unsaved in
+        memory and are saved by next flush.
+
+        Example:
+            with task_manager.transaction():
+                task_manager.status(1)
+                task_manager.change(2, title="new title")
+
+        Yields:
+            TaskManager: this task manager
+        """
+
+        with self.__exclusive():
+            if self.__undo is not None:
+                yield self
+                return
+
+            self.__get_tasks_and_last_id()
+            records, last_id = len(self.__records), self.__last_id
+            self.__undo = list()
+
+            try:
+                yield self
+            except BaseException:
+                self.__rollback(records, last_id)
+                raise
+            finally:
+                self.__undo = None
+
+            self.flush()
+
+    def __rollback(self, records: int, last_id: int) -> None:
+        """Undo changes of open transaction
+
+        Args:
+            records (int): number of unsaved records before transaction
+            last_id (int): last task id before transaction
+        """
+
+        restored = False
+
+        for id, previous in reversed(self.__undo):
+            if previous is None:
+                del self.__tasks[id]
+            else:
+                restored = restored or id not in self.__tasks
+                self.__tasks[id] = previous
+
+        # Restored removed tasks are back in id order
+        if restored:
+            self.__tasks = dict(sorted(self.__tasks.items()))
+
+        del self.__records[records:]
+        self.__last_id = last_id
+        self.__indexes_valid = False
+
+    def close(self) -> None:
+        """Write unsaved changes and changed text index, called on interpreter exit"""
+
+        if self.__flush_timer is not None:
+            self.__flush_timer.cancel()
+            self.__flush_timer = None
+
+        self.flush()
+
+        if self.__indexes_valid and self.__text_index_changed and exists(self.save_file):
+            self.__indexes["text"].save(self.text_index_file, self.__signature)
+            self.__text_index_changed = False
+
+    def resolve_ordinal(self, ordinal: int) -> int | None:
+        """Get id of task shown at position ordinal (starting from 1) in task list
+
+        Args:
+            ordinal (int): task position
+
+        Returns:
+            int | None: Task's id OR None if there is no such position
+        """
+
+        tasks, _ = self.__get_tasks_and_last_id()
+
+        if ordinal not in range(1, len(tasks) + 1):
+            return None
+
+        return next(islice(iter(tasks), ordinal - 1, None))
+
+    def __add_task(self, title: str, description: str, category: str, deadline: str, priority: str) -> Task | str:
+        """Create new Task without saving it
 
         Args:
             title (str): Task's title
@@ -105,20 +404,99 @@ class TaskManager:
             Task | str: Task object OR description if operation failed
         """
 
-        # Get tasks from save file and last task id
-        task_list, last_id = self.__get_tasks_and_last_id()
-
         try:
-            # Create new task and save it
-            task = Task(last_id + 1, title, description, category, deadline, priority)
-            task_list.append(asdict(task))
-            self.__save_tasks(task_list)
+            task = Task(self.__last_id + 1, title, description, category, deadline, priority)
+            self.__apply({"op": "add", "task": task.to_dict()})
 
             return task
 
         except:
             return "Operation failed during adding new task to save file"
 
+    def __remove_task(self, id: int) -> Task | str:
+        """Remove task by id without saving it
+
+        Args:
+            id (int): Task's id
+
+        Returns:
+            Task | str: removed Task object OR failure description
+        """
+
+        # Check if id not in task list
+        if id not in self.__tasks:
+            return f"No task with ID '{id}'"
+
+        return self.__apply({"op": "remove", "id": id})
+
+    def __change_task(self, id: int, fields: dict) -> Task | str:
+        """Change task by id without saving it, fields with None value are not changed
+
+        Args:
+            id (int): Task's id
+            fields (dict): new task data by field name
+
+        Returns:
+            Task | str: Task object OR failure description
+        """
+
+        # Check if id not in task list
+        if id not in self.__tasks:
+            return f"No task with ID '{id}'"
+
+        # Replcae old task data with new one
+        fields = {key: value for key, value in fields.items()
+                  if key in CHANGEABLE_FIELDS and value is not None}
+
+        return self.__apply({"op": "change", "id": id, "fields": fields})
+
+    def __set_status(self, id: int, status: str = None) -> Task | str:
+        """Set status for task by id without saving it, switch it if status is None
+
+        Args:
+            id (int): Task's id
+            status (str, optional): new status. Defaults to None.
+
+        Returns:
+            Task | str: Task object OR failure description
+        """
+
+        # Check if id not in task list
+        if id not in self.__tasks:
+            return f"No task with ID '{id}'"
+
+        # Get current status and replace it
+        if status is None:
+            status = self.__tasks[id].status
+            status = "Done" if status == "In progress" else "In progress"
+
+        return self.__apply({"op": "status", "id": id, "status": status})
+
+    def add(self, title: str, description: str, category: str, deadline: str, priority: str) -> Task | str:
+        """Create new Task and save it to json file
+
+        Args:
+            title (str): Task's title
+            description (str): Task's description
+            category (str): Task's category
+            deadline (str): Task's deadline
+            priority (str): Task's priority
+
+        Returns:
+            Task | str: Task object OR description if operation failed
+        """
+
+        # Other processes wait until changes are saved
+        with self.__exclusive():
+            # Get tasks from save file and last task id
+            self.__get_tasks_and_last_id()
+
+            # Create new task and save it
+            task = self.__add_task(title, description, category, deadline, priority)
+            self.__commit()
+
+            return task
+
     def remove(self, id: int = None, category: str = None) -> list[Task] | str:
         """Remove one task by id OR all tasks with specific category
 
@@ -130,47 +508,36 @@ class TaskManager:
             list[Task] | str: deleted Task objects OR failure description
         """
 
-        # Get tasks from save file and last task id
-        task_list, _ = self.__get_tasks_and_last_id()
-        removed_tasks = list()
-
-        # Remove task by id
-        if id:
-            # Check if id not in task list
-            if id not in range(1, len(task_list) + 1):
-                return f"No task with ID '{id}'"
+        # Other processes wait until changes are saved
+        with self.__exclusive():
+            # Get tasks from save file and last task id
+            self.__get_tasks_and_last_id()
+            removed_tasks = list()
 
-            # Pop task and create Task object for return
-            popped = task_list.pop(id-1)
-            removed_tasks.append(Task(*popped.values()))
+            # Remove task by id
+            if id:
+                removed = self.__remove_task(id)
 
-            # Reorder tasks id and save changes
-            task_list = self.__reorder_id(task_list)
-            self.__save_tasks(task_list)
+                # Check if operation failed
+                if isinstance(removed, str):
+                    return removed
 
-        # Remove tasks by category
-        if category:
-            # Check if category not in task list
-            if category not in [task['category'] for task in task_list]:
-                return f"No task with category '{category}'"
+                removed_tasks.append(removed)
 
-            # Find tasks with provided category
-            id = 0
-            for task in task_list.copy():
-                if task['category'] == category:
+            # Remove tasks by category
+            if category:
+                category_ids = sorted(self.__get_indexes()['category'].lookup(category))
 
-                    # Pop task and create Task object for return
-                    popped = task_list.pop(id)
-                    removed_tasks.append(Task(*popped.values()))
-                    id -= 1
+                # Check if category not in task list
+                if not category_ids:
+                    return f"No task with category '{category}'"
 
-                id += 1
+                removed_tasks.extend(self.__remove_task(category_id) for category_id in category_ids)
 
-            # Reorder tasks id and save changes
-            task_list = self.__reorder_id(task_list)
-            self.__save_tasks(task_list)
+            # Save changes
+            self.__commit()
 
-        return removed_tasks
+            return removed_tasks
 
     def change(self, id: int, title: str = None, description: str = None, category: str = None, deadline: str = None, priority: str = None) -> Task | str:
         """Change task by id with new data. All data is optional.
@@ -187,22 +554,17 @@ class TaskManager:
             Task | str: Task object OR failure description
         """
 
-        # Get tasks from save file and last task id
-        task_list, _ = self.__get_tasks_and_last_id()
+        # Other processes wait until changes are saved
+        with self.__exclusive():
+            # Get tasks from save file and last task id
+            self.__get_tasks_and_last_id()
 
-        # Check if id not in task list
-        if id not in range(1, len(task_list) + 1):
-            return f"No task with ID '{id}'"
-
-        # Replcae old task data with new one
-        for key in task_list[id-1].copy():
-            if locals().get(key) is not None:
-                task_list[id-1][key] = locals().get(key)
+            # Change task and save changes
+            task = self.__change_task(id, {"title": title, "description": description, "category": category,
+                                           "deadline": deadline, "priority": priority})
+            self.__commit()
 
-        # Save changes
-        self.__save_tasks(task_list)
-
-        return Task(*task_list[id-1].values())
+            return task
 
     def status(self, id: int) -> Task | str:
         """Switch status for task with specific id
@@ -214,24 +576,186 @@ class TaskManager:
             Task | str: Task object OR failure description
         """
 
-        # Get tasks from save file and last task id
-        task_list, _ = self.__get_tasks_and_last_id()
+        # Other processes wait until changes are saved
+        with self.__exclusive():
+            # Get tasks from save file and last task id
+            self.__get_tasks_and_last_id()
 
-        # Check if id not in task list
-        if id not in range(1, len(task_list) + 1):
-            return f"No task with ID '{id}'"
+            # Switch status and save changes
+            task = self.__set_status(id)
+            self.__commit()
 
-        # Get current status and replace it
-        status = task_list[id-1]['status']
-        task_list[id-1]['status'] = "Done" if status == "In progress" else "In progress"
+            return task
+
+    def add_many(self, items: Iterable[tuple | dict]) -> list[Task | str]:
+        """Create many tasks with one load and one save
+
+        Args:
+            items (Iterable[tuple | dict]): (title, description, category, deadline, priority) tuples
+                OR dicts with the same keys
+
+        Returns:
+            list[Task | str]: Task object OR failure description for every item
+        """
+
+        # Other processes wait until changes are saved
+        with self.__exclusive():
+            # Get tasks from save file and last task id
+            self.__get_tasks_and_last_id()
+            results = list()
 
-        # Save changes
-        self.__save_tasks(task_list)
+            for item in items:
+                if isinstance(item, dict):
+                    item = tuple(item.get(key) for key in CHANGEABLE_FIELDS)
 
-        return Task(*task_list[id-1].values())
+                results.append(self.__add_task(*item))
 
-    def find(self, id: int = None, title: str = None, category: str = None, priority: str = None, status: str = None) -> list[Task] | str:
-        """Filter tasks by id, title, category, priority or status 
+            # Save changes
+            self.__commit()
+
+            return results
+
+    def remove_many(self, ids: Iterable[int]) -> list[Task | str]:
+        """Remove many tasks by id with one load and one save
+
+        Args:
+            ids (Iterable[int]): Task's ids
+
+        Returns:
+            list[Task | str]: removed Task object OR failure description for every id
+        """
+
+        # Other processes wait until changes are saved
+        with self.__exclusive():
+            # Get tasks from save file and last task id
+            self.__get_tasks_and_last_id()
+
+            results = [self.__remove_task(id) for id in ids]
+
+            # Save changes
+            self.__commit()
+
+            return results
+
+    def change_many(self, changes: Iterable[dict]) -> list[Task | str]:
+        """Change many tasks with one load and one save
+
+        Args:
+            changes (Iterable[dict]): dicts with task id and new data, like {"id": 1, "title": "new title"}
+
+        Returns:
+            list[Task | str]: Task object OR failure description for every change
+        """
+
+        # Other processes wait until changes are saved
+        with self.__exclusive():
+            # Get tasks from save file and last task id
+            self.__get_tasks_and_last_id()
+
+            results = [self.__change_task(change.get('id'), change) for change in changes]
+
+            # Save changes
+            self.__commit()
+
+            return results
+
+    def set_status_many(self, ids: Iterable[int], status: str = None) -> list[Task | str]:
+        """Set status for many tasks with one load and one save
+
+        Args:
+            ids (Iterable[int]): Task's ids
+            status (str, optional): new status, switch current one if None. Defaults to None.
+
+        Returns:
+            list[Task | str]: Task object OR failure description for every id
+        """
+
+        # Other processes wait until changes are saved
+        with self.__exclusive():
+            # Get tasks from save file and last task id
+            self.__get_tasks_and_last_id()
+
+            results = [self.__set_status(id, status) for id in ids]
+
+            # Save changes
+            self.__commit()
+
+            return results
+
+    def __find_ids(self, tasks: dict[int, Task], filters: dict, match: str) -> list[int]:
+        """Get ids of tasks found by filters
+
+        Args:
+            tasks (dict[int, Task]): Task objects by id
+            filters (dict): filter values by task field, only not empty ones
+            match (str): "any" - ids found by each filter one after another, "all" - ids matching every filter
+
+        Returns:
+            list[int]: task ids
+        """
+
+        if match not in ("any", "all"):
+            raise ValueError(f"Unknown match mode '{match}', expected 'any' or 'all'")
+
+        # Storage backend with its own indexes answers every filter by query
+        if hasattr(self.__store, "find"):
+            self.flush()
+            found = [[task.id for task in self.__store.find(field, value)] for field, value in filters.items()]
+
+        # Exact match filters of all mode are answered by intersecting index sets, smallest first
+        elif match == "all":
+            indexes = self.__get_indexes()
+            sets = sorted((indexes[field].lookup(value) for field, value in filters.items()
+                           if field in INDEXED_FIELDS), key=len)
+            ids = set(sets[0]).intersection(*sets[1:]) if sets else set(tasks)
+
+            if "id" in filters:
+                ids &= {filters["id"]}
+            if "title" in filters:
+                title_ids = indexes["text"].candidates("title", filters["title"])
+                ids = ids if title_ids is None else ids & title_ids
+                ids = {id for id in ids if filters["title"] in tasks[id].title}
+
+            found = [ids] if filters else []
+
+        # Exact match filters are answered by indexes, title by scan
+        else:
+            indexes = self.__get_indexes()
+            found = list()
+
+            for field, value in filters.items():
+                if field == "id":
+                    found.append([value] if value in tasks else [])
+                elif field == "title":
+                    title_ids = indexes["text"].candidates("title", value)
+                    candidates = tasks.values() if title_ids is None else (tasks[id] for id in sorted(title_ids))
+                    found.append([task.id for task in candidates if value in task.title])
+                else:
+                    found.append(sorted(indexes[field].lookup(value)))
+
+        # Combine results of every filter
+        if match == "all" and found:
+            return sorted(set(found[0]).intersection(*found[1:]))
+        else:
+            return [id for field_ids in found for id in field_ids]
+
+    def __is_loaded(self) -> bool:
+        """Check if in-memory tasks can be used without reading save file
+
+        Returns:
+            bool: True if tasks are loaded and up to date
+        """
+
+        return self.__tasks is not None and (bool(self.__records) or self.__store.signature() == self.__signature)
+
+    def find(self, id: int = None, title: str = None, category: str = None, priority: str = None, status: str = None,
+             match: str = "any") -> list[Task] | str:
+        """Filter tasks by id, title, category, priority or status
+
+        With match="any" result holds tasks found by each filter one after another,
+        with match="all" - only tasks matching every filter. Category, priority
+        and status are looked up in secondary indexes, combined filters are
+        answered by intersecting index sets.
 
         Args:
             id (int, optional): Task's id. Defaults to None.
@@ -239,40 +763,182 @@ class TaskManager:
             category (str, optional): Task's category. Defaults to None.
             priority (str, optional): Task's priority. Defaults to None.
             status (str, optional): Task's status. Defaults to None.
+            match (str, optional): "any" or "all". Defaults to "any".
 
         Returns:
             list[Task] | str: Task objects list OR 'no task found'
         """
 
         # Get tasks from save file and last task id
-        task_list, _ = self.__get_tasks_and_last_id()
-        filtered_tasks = list()
-
-        # Filter tasks
-        if id:
-            filtered_tasks.append(Task(*task_list[id-1].values()))
-        if title:
-            for task in task_list:
-                if title in task['title']:
-                    filtered_tasks.append(Task(*task.values()))
-        if category:
-            for task in task_list:
-                if category == task['category']:
-                    filtered_tasks.append(Task(*task.values()))
-        if priority:
-            for task in task_list:
-                if priority == task['priority']:
-                    filtered_tasks.append(Task(*task.values()))
-        if status:
-            for task in task_list:
-                if status == task['status']:
-                    filtered_tasks.append(Task(*task.values()))
+        tasks, _ = self.__get_tasks_and_last_id()
+        filters = {"id": id, "title": title, "category": category, "priority": priority, "status": status}
+        filters = {field: value for field, value in filters.items() if value}
+
+        filtered_ids = self.__find_ids(tasks, filters, match)
 
         # Check if filtered tasks is empty and return result
-        if len(filtered_tasks) == 0:
+        if len(filtered_ids) == 0:
             return "no task found"
         else:
-            return filtered_tasks
+            return [tasks[id] for id in filtered_ids]
+
+    def query(self, where: Predicate = None, sort_by: str | Iterable[str] = "id", reverse: bool = False,
+              limit: int = None) -> list[Task]:
+        """Find tasks by combined predicates, sort them and keep first ones
+
+        Example - 10 most urgent tasks in progress:
+            query(Eq("status", "In progress"), sort_by=("deadline", "priority"), limit=10)
+
+        Args:
+            where (Predicate, optional): filter built from query.Eq, Contains, Between, And and Or. Defaults to None.
+            sort_by (str | Iterable[str], optional): task field(s) to sort by, priority goes from high to low.
+                Defaults to "id".
+            reverse (bool, optional): sort in descending order. Defaults to False.
+            limit (int, optional): maximum number of tasks, all if None. Defaults to None.
+
+        Returns:
+            list[Task]: found Task objects
+        """
+
+        # Get tasks from save file and last task id
+        tasks, _ = self.__get_tasks_and_last_id()
+
+        return run_query(tasks, self.__get_indexes(), where, sort_by, reverse, limit)
+
+    def search(self, text: str, limit: int = 10) -> list[Task]:
+        """Find tasks containing any of words from text in title or description, best first
+
+        Case is ignored. Tasks containing more words go first, then tasks
+        with words in title. Candidates are taken from trigram index, so only
+        tasks sharing trigrams with words are checked.
+
+        Args:
+            text (str): searched words separated by spaces
+            limit (int, optional): maximum number of tasks. Defaults to 10.
+
+        Returns:
+            list[Task]: Task objects
+        """
+
+        # Get tasks from save file and last task id
+        tasks, _ = self.__get_tasks_and_last_id()
+        text_index: TextIndex = self.__get_indexes()["text"]
+        found_words: dict[int, set[str]] = dict()
+        weights: dict[int, int] = dict()
+
+        for word in set(text.lower().split()):
+            for field, weight in (("title", 2), ("description", 1)):
+                candidates = text_index.candidates(field, word)
+                for id in (tasks if candidates is None else candidates):
+                    if word in getattr(tasks[id], field).lower():
+                        found_words.setdefault(id, set()).add(word)
+                        weights[id] = weights.get(id, 0) + weight
+
+        # Number of found words, then weight by field, then older task
+        ranked = nlargest(limit, found_words, key=lambda id: (len(found_words[id]), weights[id], -id))
+        return [tasks[id] for id in ranked]
+
+    def due(self, before: str | date = None, after: str | date = None) -> list[Task]:
+        """Get tasks with deadline between after and before, both included, ordered by deadline
+
+        Deadlines are kept in sorted index, so only found tasks are visited.
+        Tasks with deadline that is not a date are never returned.
+
+        Args:
+            before (str | date, optional): last deadline like 2024-12-31, not limited if None. Defaults to None.
+            after (str | date, optional): first deadline like 2024-12-31, not limited if None. Defaults to None.
+
+        Returns:
+            list[Task]: Task objects
+        """
+
+        # Get tasks from save file and last task id
+        tasks, _ = self.__get_tasks_and_last_id()
+
+        high = before.toordinal() if isinstance(before, date) else deadline_ordinal(before)
+        low = after.toordinal() if isinstance(after, date) else deadline_ordinal(after)
+
+        return [tasks[id] for id in self.__get_indexes()["deadline"].range(low, high)]
+
+    def overdue(self, today: str | date = None) -> list[Task]:
+        """Get not done tasks with deadline before today, ordered by deadline
+
+        Args:
+            today (str | date, optional): current date, system date if None. Defaults to None.
+
+        Returns:
+            list[Task]: Task objects
+        """
+
+        today = date.fromisoformat(today) if isinstance(today, str) else today or date.today()
+
+        return [task for task in self.due(before=today - timedelta(days=1)) if task.status != "Done"]
+
+    def iter_find(self, id: int = None, title: str = None, category: str = None, priority: str = None,
+                  status: str = None, match: str = "any", offset: int = 0, limit: int = None,
+                  after_id: int = None) -> Iterator[Task]:
+        """Iterate over tasks found by filters in id order, every task is yielded once
+
+        Loaded tasks are filtered with indexes like in find(). If tasks are not
+        loaded yet, they are streamed from save file and filtered one by one, so
+        first page does not wait for whole file.
+
+        Args:
+            id (int, optional): Task's id. Defaults to None.
+            title (str, optional): Task's title. Defaults to None.
+            category (str, optional): Task's category. Defaults to None.
+            priority (str, optional): Task's priority. Defaults to None.
+            status (str, optional): Task's status. Defaults to None.
+            match (str, optional): "any" or "all". Defaults to "any".
+            offset (int, optional): found tasks to skip. Defaults to 0.
+            limit (int, optional): maximum number of tasks, all if None. Defaults to None.
+            after_id (int, optional): cursor, yield only tasks with bigger id. Defaults to None.
+
+        Yields:
+            Iterator[Task]: Task objects
+        """
+
+        filters = {"id": id, "title": title, "category": category, "priority": priority, "status": status}
+        filters = {field: value for field, value in filters.items() if value}
+
+        if match not in ("any", "all"):
+            raise ValueError(f"Unknown match mode '{match}', expected 'any' or 'all'")
+
+        # Stream tasks from save file and check every one
+        if not self.__is_loaded() and hasattr(self.__store, "iter_tasks"):
+            check = all if match == "all" else any
+            found = (task for task in self.__store.iter_tasks()
+                     if filters and check(_matches(task, field, value) for field, value in filters.items()))
+
+        # Look up loaded tasks in indexes
+        else:
+            tasks, _ = self.__get_tasks_and_last_id()
+            found = (tasks[id] for id in sorted(set(self.__find_ids(tasks, filters, match))))
+
+        return _page(found, offset, limit, after_id)
+
+    def iter_tasks(self, offset: int = 0, limit: int = None, after_id: int = None) -> Iterator[Task]:
+        """Iterate over tasks in id order without building list
+
+        If tasks are not loaded yet, they are streamed from save file, so first
+        page does not wait for whole file. Tasks must not be changed while
+        iterating over loaded ones.
+
+        Args:
+            offset (int, optional): tasks to skip. Defaults to 0.
+            limit (int, optional): maximum number of tasks, all if None. Defaults to None.
+            after_id (int, optional): cursor, yield only tasks with bigger id. Defaults to None.
+
+        Yields:
+            Iterator[Task]: Task objects
+        """
+
+        if not self.__is_loaded() and hasattr(self.__store, "iter_tasks"):
+            tasks = self.__store.iter_tasks()
+        else:
+            tasks = iter(self.__get_tasks_and_last_id()[0].values())
+
+        return _page(tasks, offset, limit, after_id)
 
     def show(self) -> list[Task] | str:
         """Get Task objects list
@@ -282,9 +948,65 @@ class TaskManager:
         """
 
         # Get tasks from save file and last task id
-        task_list, _ = self.__get_tasks_and_last_id()
+        tasks, _ = self.__get_tasks_and_last_id()
 
-        if len(task_list) == 0:
+        if len(tasks) == 0:
             return "You have no task at the moment - create one! (add)"
         else:
-            return [Task(*task.values()) for task in task_list]
+            return list(tasks.values())
+
+    def export(self, path: str, indent: int = 4) -> int:
+        """Write all tasks to readable json file, save file itself is kept compact
+
+        Exported file has save file format, so it can be used as save file.
+
+        Args:
+            path (str): export file path
+            indent (int, optional): indent of pretty printed json. Defaults to 4.
+
+        Returns:
+            int: number of exported tasks
+        """
+
+        tasks, last_id = self.__get_tasks_and_last_id()
+        write_atomic(path, dump_tasks(tasks, last_id, indent=indent))
+
+        return len(tasks)
+
+
+def _matches(task: Task, field: str, value: str | int) -> bool:
+    """Check task against one find() filter
+
+    Args:
+        task (Task): Task object
+        field (str): id, title, category, priority or status
+        value (str | int): filter value
+
+    Returns:
+        bool: True if task is found by filter
+    """
+
+    if field == "title":
+        return value in task.title
+
+    return getattr(task, field) == value
+
+
+def _page(tasks: Iterator[Task], offset: int = 0, limit: int = None, after_id: int = None) -> Iterator[Task]:
+    """Cut one page from tasks ordered by id
+
+    Args:
+        tasks (Iterator[Task]): Task objects ordered by id
+        offset (int, optional): tasks to skip. Defaults to 0.
+        limit (int, optional): maximum number of tasks, all if None. Defaults to None.
+        after_id (int, optional): cursor, skip tasks with id up to it. Defaults to None.
+
+    Returns:
+        Iterator[Task]: Task objects of page
+    """
+
+    if after_id is not None:
+        tasks = dropwhile(lambda task: task.id <= after_id, tasks)
+
+    return islice(tasks, offset, None if limit is None else offset + limit)
+
@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+
+from src.async_task_manager import AsyncTaskManager
+from src.storage import read_generation
+from src.task_manager import TaskManager
+
+
+@pytest.fixture(scope='function')
+def save_file_path(tmp_path):
+    return str(tmp_path / "tasks.json")
+
+
+def test_concurrent_changes(save_file_path):
+    async def client(task_manager: AsyncTaskManager, number: int):
+        task = await task_manager.add(f"title{number}", "description", f"category{number % 2}", "2024-01-01", "low")
+        return await task_manager.status(task.id)
+
+    async def main():
+        task_manager = AsyncTaskManager(save_file_path)
+        tasks = await asyncio.gather(*(client(task_manager, number) for number in range(50)))
+
+        # Every change is saved when it is returned
+        saved = TaskManager(save_file_path).show()
+        assert sorted(task.id for task in tasks) == list(range(1, 51))
+        assert len(saved) == 50 and all(task.status == "Done" for task in saved)
+
+        # Concurrent changes share saves
+        assert read_generation(save_file_path) < 50
+
+        assert len(await task_manager.find(category="category1")) == 25
+        assert [task.id async for task in task_manager.iter_tasks(page_size=7)] == list(range(1, 51))
+
+        await task_manager.close()
+
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+import pytest
+
+from src.task_manager import TaskManager
+from src.query import Eq, Contains, Between, And, Or, before, after, plan
+from src.indexes import FieldIndex
+
+
+@pytest.fixture(scope='function')
+def task_manager(tmp_path):
+    task_manager = TaskManager(str(tmp_path / "tasks.json"))
+    task_manager.add_many([
+        ("write report", "quarterly", "work", "2024-03-10", "medium"),
+        ("buy milk", "2 liters", "home", "2024-03-01", "low"),
+        ("fix bug", "login page", "work", "2024-02-20", "high"),
+        ("call mom", "", "home", "2024-03-01", "high"),
+        ("plan trip", "summer", "leisure", "someday", "low"),
+    ])
+    task_manager.status(2)
+
+    return task_manager
+
+
+def ids(tasks):
+    return [task.id for task in tasks]
+
+
+def test_predicates(task_manager):
+    assert ids(task_manager.query(And(Eq("category", "work"), Eq("priority", "high")))) == [3]
+    assert ids(task_manager.query(Or(Eq("category", "leisure"), Eq("status", "Done")))) == [2, 5]
+    assert ids(task_manager.query(Or(Eq("category", "home"), Contains("title", "bug")))) == [2, 3, 4]
+
+    # Deadlines are compared as dates, not a date never matches
+    assert ids(task_manager.query(Between("deadline", "2024-02-25", "2024-03-05"))) == [2, 4]
+    assert ids(task_manager.query(before("deadline", "2024-03-01"))) == [2, 3, 4]
+    assert ids(task_manager.query(after("deadline", "2024-03-02"))) == [1]
+
+
+def test_sort_and_limit(task_manager):
+    # Most urgent open tasks
+    open_tasks = Eq("status", "In progress")
+    assert ids(task_manager.query(open_tasks, sort_by=("deadline", "priority"), limit=2)) == [3, 4]
+    assert ids(task_manager.query(sort_by=("priority", "id"))) == [3, 4, 1, 2, 5]
+    assert ids(task_manager.query(sort_by="deadline", reverse=True, limit=1)) == [5]
+
+
+def test_plan(task_manager):
+    tasks = {task.id: task for task in task_manager.show()}
+    indexes = {"category": FieldIndex("category")}
+    indexes["category"].rebuild(tasks.values())
+
+    # Indexed children narrow candidates, not indexed Or falls back to scan
+    assert plan(And(Eq("category", "work"), Contains("title", "x")), indexes, tasks) == {1, 3}
+    assert plan(Or(Eq("category", "work"), Eq("id", 2)), indexes, tasks) == {1, 2, 3}
+    assert plan(Or(Eq("category", "work"), Contains("title", "x")), indexes, tasks) is None
+
+
+def test_due(task_manager):
+    assert ids(task_manager.due(after="2024-02-25", before="2024-03-05")) == [2, 4]
+    assert ids(task_manager.due(before="2024-03-01")) == [3, 2, 4]
+    assert ids(task_manager.due()) == [3, 2, 4, 1]
+
+    # Done task is not overdue
+    assert ids(task_manager.overdue(today="2024-03-02")) == [3, 4]
+
+    # Deadline index follows changes
+    task_manager.change(1, deadline="2024-01-01")
+    task_manager.remove(id=3)
+    task_manager.change(5, deadline="2024-02-01")
+    assert ids(task_manager.due(before="2024-03-01")) == [1, 5, 2, 4]
+    assert ids(task_manager.query(before("deadline", "2024-02-15"))) == [1, 5]
+
+
+def test_search(task_manager):
+    # More found words first, title weighs more than description
+    assert ids(task_manager.search("page fix")) == [3]
+    assert ids(task_manager.search("LITERS milk call")) == [2, 4]
+    assert ids(task_manager.search("mmer rep")) == [1, 5]
+    assert ids(task_manager.query(Contains("description", "ogin"))) == [3]
+
+    # Text index follows changes
+    task_manager.change(4, title="call dad", description="about summer")
+    assert ids(task_manager.search("summer")) == [4, 5]
+    assert ids(task_manager.find(title="dad")) == [4]
+
+
+def test_text_index_file(task_manager):
+    assert ids(task_manager.search("trip")) == [5]
+
+    # Saved index is used while save file is not changed
+    task_manager.close()
+    reloaded = TaskManager(task_manager.save_file)
+    assert ids(reloaded.search("trip")) == [5]
+
+    with open(reloaded.text_index_file) as file:
+        assert '"tri"' in file.read()
+
+    task_manager.add("trip report", "", "work", "2024-04-01", "low")
+    assert ids(TaskManager(task_manager.save_file).search("trip")) == [5, 6]
@@ -0,0 +1,71 @@
+from http.client import HTTPConnection
+from json import dumps, loads
+from threading import Thread
+import socket
+import pytest
+
+from src.server import TaskServer
+from src.task_manager import TaskManager
+
+
+@pytest.fixture(scope='function')
+def server(tmp_path):
+    server = TaskServer(("127.0.0.1", 0), TaskManager(str(tmp_path / "tasks.json")))
+    Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(connection: HTTPConnection, method: str, path: str, body=None) -> tuple[int, dict | list]:
+    connection.request(method, path, body=dumps(body) if body is not None else None,
+                       headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, loads(response.read())
+
+
+def task_data(number: int) -> dict:
+    return {"title": f"title{number}", "description": f"description{number}", "category": f"category{number % 2}",
+            "deadline": "2024-12-31", "priority": "low"}
+
+
+def test_crud(server):
+    # One connection is kept open for all requests
+    connection = HTTPConnection(*server.server_address)
+
+    assert request(connection, "GET", "/tasks") == (200, [])
+    assert request(connection, "POST", "/tasks", task_data(1))[0] == 201
+    assert request(connection, "POST", "/tasks", task_data(2))[1]["id"] == 2
+    assert request(connection, "POST", "/tasks", {**task_data(3), "priority": "urgent"}) == (
+        400, {"error": "wrong priority 'urgent'"})
+
+    assert request(connection, "PATCH", "/tasks/1", {"title": "changed"})[1]["title"] == "changed"
+    assert request(connection, "POST", "/tasks/2/status")[1]["status"] == "Done"
+    assert request(connection, "GET", "/tasks?status=Done")[1][0]["id"] == 2
+    assert request(connection, "GET", "/tasks/1")[1]["title"] == "changed"
+
+    assert request(connection, "DELETE", "/tasks/1")[1][0]["id"] == 1
+    assert request(connection, "DELETE", "/tasks/1")[0] == 404
+    assert request(connection, "GET", "/tasks/1")[0] == 404
+
+    # Changes are saved before response
+    assert [task.id for task in TaskManager(server.task_manager.save_file).show()] == [2]
+
+
+def test_batch_and_pipelining(server):
+    connection = HTTPConnection(*server.server_address)
+
+    status, results = request(connection, "POST", "/batch", [{"op": "add", **task_data(number)} for number in range(4)]
+                              + [{"op": "remove", "category": "category0"}, {"op": "status", "id": 100}])
+    assert status == 200
+    assert [result["status"] for result in results] == [201, 201, 201, 201, 200, 404]
+    assert [task["id"] for task in results[4]["result"]] == [1, 3]
+
+    # Requests sent at once are answered in order on one connection
+    with socket.create_connection(server.server_address) as client:
+        client.sendall(b"".join(f"GET /tasks/{id} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode() for id in (2, 4)))
+        responses = b""
+        while responses.count(b"HTTP/1.1") < 2 or not responses.endswith(b"}"):
+            responses += client.recv(65536)
+
+    assert responses.index(b'"id":2') < responses.index(b'"id":4')
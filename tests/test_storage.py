@@ -0,0 +1,206 @@
+from dataclasses import asdict
+from json import dumps, load
+from multiprocessing import get_context
+from os import listdir
+import pytest
+
+from src.task_manager import TaskManager
+from src.storage import JournalStore, StaleStoreError, JsonStore, fcntl, write_atomic
+
+
+@pytest.fixture(scope='function')
+def save_file_path(tmp_path):
+    return str(tmp_path / "tasks.json")
+
+
+def add_tasks(task_manager: TaskManager, count: int) -> None:
+    for number in range(1, count + 1):
+        task_manager.add(f"title{number}", f"description{number}", f"category{number % 2}",
+                         f"deadline{number}", f"priority{number}")
+
+
+def test_journal_replay(save_file_path):
+    task_manager = TaskManager(save_file_path, storage="journal")
+    add_tasks(task_manager, 5)
+    task_manager.change(2, title="TITLE2")
+    task_manager.status(3)
+    task_manager.remove(id=1)
+    task_manager.remove(category="category0")
+
+    # Snapshot is untouched, every change went to journal
+    with open(save_file_path) as file:
+        assert file.read() == ""
+
+    # New manager must see the same tasks after replay
+    reloaded = TaskManager(save_file_path, storage="journal")
+    assert [asdict(task) for task in reloaded.show()] == [asdict(task) for task in task_manager.show()]
+    assert [task.title for task in reloaded.show()] == ["title3", "title5"]
+    assert [task.id for task in reloaded.show()] == [3, 5]
+
+
+def test_journal_compaction(save_file_path):
+    task_manager = TaskManager(save_file_path, storage="journal", compact_threshold=3)
+    add_tasks(task_manager, 4)
+
+    # Threshold reached - journal folded into snapshot
+    with open(save_file_path + ".journal") as journal:
+        assert len(journal.read().splitlines()) == 2
+
+    reloaded = TaskManager(save_file_path, storage="journal")
+    assert len(reloaded.show()) == 4
+
+
+def test_journal_torn_and_stale(save_file_path):
+    task_manager = TaskManager(save_file_path, storage="journal")
+    add_tasks(task_manager, 2)
+
+    # Half-written last record is ignored
+    with open(save_file_path + ".journal", "a") as journal:
+        journal.write('{"op": "add", "task": {"id"')
+    assert len(TaskManager(save_file_path, storage="journal").show()) == 2
+
+    # Journal of another snapshot is already folded into it and skipped
+    JournalStore(save_file_path).compact({task.id: task for task in task_manager.show()}, 2)
+    with open(save_file_path + ".journal", "w") as journal:
+        journal.write('{"crc": 1}\n' + dumps({"op": "remove", "id": 1}) + "\n")
+    assert len(TaskManager(save_file_path, storage="journal").show()) == 2
+
+
+def test_sqlite_migration_and_find(save_file_path):
+    # Fill json save file and migrate it to database
+    add_tasks(TaskManager(save_file_path), 5)
+    task_manager = TaskManager(save_file_path, storage="sqlite")
+    assert [task.title for task in task_manager.show()] == [f"title{number}" for number in range(1, 6)]
+
+    task_manager.change(2, title="special title")
+    task_manager.status(3)
+    task_manager.remove(id=1)
+
+    # Indexed queries after removal
+    assert [task.id for task in task_manager.find(title="special")] == [2]
+    assert [task.id for task in task_manager.find(title="le5")] == [5]
+    assert [task.id for task in task_manager.find(title="e")] == [2, 3, 4, 5]
+    assert [task.title for task in task_manager.find(status="Done")] == ["title3"]
+    assert [task.id for task in task_manager.find(category="category1")] == [3, 5]
+    assert task_manager.find(priority="nothing") == "no task found"
+
+    # Database keeps changes, json save file is not used anymore
+    reloaded = TaskManager(save_file_path, storage="sqlite")
+    assert [asdict(task) for task in reloaded.show()] == [asdict(task) for task in task_manager.show()]
+
+
+def test_atomic_save_and_backups(save_file_path, tmp_path):
+    task_manager = TaskManager(save_file_path, backups=2)
+    add_tasks(task_manager, 3)
+
+    # Save file is compact, temp files are not left behind
+    with open(save_file_path) as file:
+        content = file.read()
+    assert "\n" not in content and ", " not in content
+    assert sorted(listdir(tmp_path)) == ["tasks.json", "tasks.json.bak.1", "tasks.json.bak.2",
+                                      "tasks.json.lock"]
+
+    # Backups keep previous versions, newest first
+    with open(save_file_path + ".bak.1") as file:
+        assert len(load(file)["tasks"]) == 2
+    with open(save_file_path + ".bak.2") as file:
+        assert len(load(file)["tasks"]) == 1
+
+    # Failed write leaves old content in place
+    with pytest.raises(TypeError):
+        write_atomic(save_file_path, "not bytes")
+    with open(save_file_path) as file:
+        assert file.read() == content
+    assert "tasks.json" in listdir(tmp_path) and len(listdir(tmp_path)) == 4
+
+
+def test_export(save_file_path, tmp_path):
+    task_manager = TaskManager(save_file_path)
+    add_tasks(task_manager, 3)
+
+    export_path = str(tmp_path / "export.json")
+    assert task_manager.export(export_path) == 3
+
+    # Export is pretty printed and can be used as save file
+    with open(export_path) as file:
+        assert file.read().startswith('{\n    "last_id": 3')
+    assert [asdict(task) for task in TaskManager(export_path).show()] == [asdict(task) for task in task_manager.show()]
+
+
+def test_stale_save(save_file_path):
+    first, second = JsonStore(save_file_path), JsonStore(save_file_path)
+    first.load()
+    second.load()
+
+    first.save({}, 0, [])
+    with pytest.raises(StaleStoreError):
+        second.save({}, 0, [])
+
+    # Deferred changes are applied on top of tasks saved by another manager
+    deferred = TaskManager(save_file_path, flush_policy="exit")
+    add_tasks(deferred, 2)
+    deferred.change(2, title="changed")
+    add_tasks(TaskManager(save_file_path), 3)
+    deferred.flush()
+
+    assert [(task.id, task.title) for task in TaskManager(save_file_path).show()] == [
+        (1, "title1"), (2, "title2"), (3, "title3"), (4, "title1"), (5, "changed")]
+
+
+def stress_worker(save_file_path: str, storage: str, worker: int, count: int) -> None:
+    # Odd workers keep changes in memory and flush them in batches
+    task_manager = TaskManager(save_file_path, storage=storage,
+                               flush_policy="ops" if worker % 2 else "immediate", flush_every=3)
+
+    def find_id(number: int) -> int:
+        return task_manager.find(title=f"<{worker}-{number}>")[0].id
+
+    for number in range(count):
+        task_manager.add(f"<{worker}-{number}>", "", f"worker{worker}", "2024-01-01", "low")
+
+        if number % 3 == 0:
+            task_manager.change(find_id(number), description="changed")
+        if number % 5 == 4:
+            task_manager.remove(id=find_id(number - 1))
+
+    task_manager.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="file locks are not available")
+@pytest.mark.parametrize("storage", ["json", "journal"])
+def test_concurrent_processes(save_file_path, storage):
+    workers, count = 4, 20
+
+    context = get_context()
+    processes = [context.Process(target=stress_worker, args=(save_file_path, storage, worker, count))
+                 for worker in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    # Every change of every process is kept and ids are not repeated
+    tasks = TaskManager(save_file_path, storage=storage).show()
+    expected = {(f"<{worker}-{number}>", "changed" if number % 3 == 0 else "")
+                for worker in range(workers) for number in range(count) if number % 5 != 3}
+
+    assert {(task.title, task.description) for task in tasks} == expected
+    assert len({task.id for task in tasks}) == len(tasks)
+
+
+def test_journal_batch(save_file_path):
+    task_manager = TaskManager(save_file_path, storage="journal")
+    with task_manager.transaction():
+        add_tasks(task_manager, 3)
+        task_manager.status(2)
+
+    # One save is one journal line, torn line loses the whole save
+    with open(save_file_path + ".journal") as journal:
+        lines = journal.read().splitlines()
+    assert len(lines) == 2
+    assert len(TaskManager(save_file_path, storage="journal").show()) == 3
+
+    with open(save_file_path + ".journal", "w") as journal:
+        journal.write(lines[0] + "\n" + lines[1][:-10])
+    assert TaskManager(save_file_path, storage="journal").show() == "You have no task at the moment - create one! (add)"
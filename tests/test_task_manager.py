@@ -1,6 +1,9 @@
 from configparser import ConfigParser
 from dataclasses import asdict
 from os import remove
+from os.path import exists
+from json import dump
+from time import sleep
 import pytest
 
 from src.task_manager import TaskManager, Task
@@ -17,6 +20,10 @@ def task_manager():
     yield task_manager
     remove(save_file_path)
 
+    # Lock file is left for other processes
+    if exists(save_file_path + ".lock"):
+        remove(save_file_path + ".lock")
+
 
 @pytest.fixture(scope='function')
 def add_data():
@@ -89,6 +96,7 @@ def test_remove_by_category(task_manager, add_data):
 
     assert [tuple(asdict(task).values())[1:-1]
             for task in removed_tasks] == [data for data in add_data if data[2] == add_data[0][2]]
+    assert [task.id for task in removed_tasks] == [1, 6]
 
 
 def test_change(task_manager, add_data, change_data):
@@ -129,3 +137,180 @@ def test_show(task_manager, add_data):
     # Compared showed data with local
     task_list = task_manager.show()
     assert [tuple(asdict(task).values())[1:-1] for task in task_list] == add_data
+
+
+def test_flush_policy_ops(task_manager, add_data):
+    manager = TaskManager(save_file_path, flush_policy="ops", flush_every=3)
+
+    # Changes stay in memory until enough of them are collected
+    for data in add_data[:2]:
+        manager.add(*data)
+    assert isinstance(task_manager.show(), str) == True
+
+    manager.add(*add_data[2])
+    assert len(task_manager.show()) == 3
+
+    # Explicit flush saves the rest
+    manager.add(*add_data[3])
+    manager.flush()
+    assert len(task_manager.show()) == 4
+
+
+def test_reload_on_outside_change(task_manager, add_data):
+    other_manager = TaskManager(save_file_path)
+
+    task_manager.add(*add_data[0])
+    assert len(other_manager.show()) == 1
+
+    # Change made by another manager must be visible
+    task_manager.add(*add_data[1])
+    assert len(other_manager.show()) == 2
+
+
+def test_find(task_manager, add_data):
+    # Add data to save file
+    for data in add_data:
+        result: Task = task_manager.add(*data)
+
+    # Any mode lists tasks found by every filter
+    assert [task.id for task in task_manager.find(category="category1")] == [1, 6]
+    assert [task.id for task in task_manager.find(id=2, category="category1")] == [2, 1, 6]
+
+    # All mode keeps tasks matching every filter
+    assert [task.id for task in task_manager.find(category="category1", priority="priority6", match="all")] == [6]
+    assert task_manager.find(id=2, category="category1", match="all") == "no task found"
+
+    # Indexes follow changes
+    task_manager.status(6)
+    task_manager.change(2, category="category1")
+    task_manager.remove(id=1)
+    assert [task.id for task in task_manager.find(category="category1")] == [2, 6]
+    assert [task.id for task in task_manager.find(category="category1", status="Done", match="all")] == [6]
+    assert [task.title for task in task_manager.find(status="In progress")] == [data[0] for data in add_data[1:5]]
+
+
+def test_stable_ids(task_manager, add_data):
+    # Add data to save file
+    for data in add_data:
+        result: Task = task_manager.add(*data)
+
+    # Removal does not renumber following tasks and ids are never reused
+    task_manager.remove(id=2)
+    task_manager.remove(id=6)
+    assert [task.id for task in task_manager.show()] == [1, 3, 4, 5]
+    assert task_manager.add(*add_data[0]).id == 7
+    assert isinstance(task_manager.status(2), str) == True
+
+    # Ordinal is position of task in task list
+    assert task_manager.resolve_ordinal(2) == 3
+    assert task_manager.resolve_ordinal(6) is None
+
+    # Last id survives reload
+    task_manager.remove(id=7)
+    assert TaskManager(save_file_path).add(*add_data[0]).id == 8
+
+
+def test_legacy_save_file(task_manager, add_data):
+    # Save file written before ids became stable holds only task list
+    with open(save_file_path, "w") as file:
+        dump([dict(zip(("id", "title", "description", "category", "deadline", "priority", "status"),
+                       (id,) + data + ("In progress",))) for id, data in enumerate(add_data, start=1)], file)
+
+    assert [task.id for task in task_manager.show()] == [1, 2, 3, 4, 5, 6]
+    assert task_manager.add(*add_data[0]).id == 7
+
+
+def test_batch(task_manager, add_data):
+    # Add all tasks with one save
+    added = task_manager.add_many(add_data[:3] + [dict(zip(("title", "description", "category", "deadline", "priority"),
+                                                           add_data[3]))])
+    assert [tuple(asdict(task).values())[1:-1] for task in added] == add_data[:4]
+
+    # Every item gets its own result
+    changed = task_manager.change_many([{"id": 1, "title": "TITLE1"}, {"id": 100, "title": "title100"}])
+    assert changed[0].title == "TITLE1" and isinstance(changed[1], str) == True
+
+    assert [task.status for task in task_manager.set_status_many([1, 2])] == ["Done", "Done"]
+    assert [task.status for task in task_manager.set_status_many([1, 3], status="Done")] == ["Done", "Done"]
+
+    removed = task_manager.remove_many(ids=[2, 100, 4])
+    assert [task.id for task in removed if not isinstance(task, str)] == [2, 4]
+
+    # Changes are saved
+    assert [(task.id, task.title, task.status) for task in TaskManager(save_file_path).show()] == \
+        [(1, "TITLE1", "Done"), (3, "title3", "Done")]
+
+
+def test_task_serialisation(task_manager, add_data):
+    task = Task.from_dict({"status": "Done", "title": "title", "id": 1, "priority": "low", "deadline": "2024-12-31",
+                           "category": "category", "description": "description"})
+    assert task == Task(1, "title", "description", "category", "2024-12-31", "low", "Done")
+    assert Task.from_dict(task.to_dict()) == task
+
+    # Deadline is parsed only if it is a date
+    assert task.deadline_ordinal == 739251
+    assert Task(2, *add_data[0]).deadline_ordinal is None
+
+    # Returned tasks are shared with manager and can not be changed
+    added = task_manager.add(*add_data[0])
+    with pytest.raises(AttributeError):
+        added.title = "TITLE1"
+
+
+def test_iter(task_manager, add_data):
+    for data in add_data:
+        result: Task = task_manager.add(*data)
+    task_manager.remove(id=2)
+
+    # Fresh manager streams tasks from save file, loaded one uses memory
+    for manager in (TaskManager(save_file_path), task_manager):
+        assert [task.id for task in manager.iter_tasks()] == [1, 3, 4, 5, 6]
+        assert [task.id for task in manager.iter_tasks(offset=1, limit=2)] == [3, 4]
+        assert [task.id for task in manager.iter_tasks(after_id=4, limit=10)] == [5, 6]
+
+        assert [task.id for task in manager.iter_find(category="category1", title="title3")] == [1, 3, 6]
+        assert [task.id for task in manager.iter_find(category="category1", title="title6", match="all")] == [6]
+        assert [task.id for task in manager.iter_find(category="category1", after_id=1)] == [6]
+
+
+def test_transaction(task_manager, add_data):
+    for data in add_data[:3]:
+        task_manager.add(*data)
+
+    # Changes are saved with one write when block ends
+    with task_manager.transaction():
+        task_manager.status(1)
+        task_manager.change(2, title="TITLE2")
+        task_manager.add(*add_data[3])
+
+        with open(save_file_path) as file:
+            assert '"Done"' not in file.read()
+
+    assert [task.title for task in TaskManager(save_file_path).find(status="Done")] == ["title1"]
+    assert TaskManager(save_file_path).find(id=4)[0].title == "title4"
+
+    # Failed block leaves tasks as they were
+    before = [asdict(task) for task in task_manager.show()]
+    with pytest.raises(RuntimeError):
+        with task_manager.transaction():
+            task_manager.remove(id=1)
+            task_manager.change(2, title="lost")
+            task_manager.add(*add_data[4])
+            raise RuntimeError
+
+    assert [asdict(task) for task in task_manager.show()] == before
+    assert [asdict(task) for task in TaskManager(save_file_path).show()] == before
+    assert task_manager.add(*add_data[4]).id == 5
+    assert task_manager.find(category="category1")[0].id == 1
+
+
+def test_flush_policy_window(task_manager, add_data):
+    manager = TaskManager(save_file_path, flush_policy="window", flush_interval=0.05)
+
+    # Changes of one window are saved together in background
+    for data in add_data[:3]:
+        manager.add(*data)
+    assert isinstance(task_manager.show(), str) == True
+
+    sleep(0.2)
+    assert len(task_manager.show()) == 3